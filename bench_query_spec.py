@@ -0,0 +1,116 @@
+"""
+Microbenchmark: per-row cost of the target filters before and after
+compile_query().
+
+    python bench_query_spec.py [--rows 2000] [--repeat 5] > bench_output.txt
+
+Imports streamlit_app in bare mode (no `streamlit run`), so Streamlit prints a
+few "missing ScriptRunContext" warnings on import; they are harmless here.
+"""
+
+import argparse
+import logging
+import re
+import time
+
+logging.disable(logging.WARNING)
+
+import streamlit_app as app  # noqa: E402
+
+TARGETS = [
+    "2011-2013 Kia Sorento AWD",
+    "2011-2013 Kia Sorento 3.5L",
+    "2014-2016 Kia Sorento",
+    "2010-2013 Mazda 6 2.5L",
+    "2008-2012 Honda Accord V6",
+    "Toyota Camry",
+]
+
+MODELS = ["KIA SORENTO", "MAZDA MAZDA6", "HONDA ACCORD", "TOYOTA CAMRY", "FORD FUSION"]
+
+
+def legacy_filter_rows(rows, query):
+    """filter_pyp_rows as it was: the query is re-parsed and re-matched per call."""
+    kw = app.extract_keywords(query)
+    ymin, ymax = app.parse_year_range(query)
+    out = []
+    for row in rows:
+        if kw:
+            hay = (row.get("title", "") + " " + row.get("raw_text", "")).lower()
+            if not all(k in hay for k in kw):
+                continue
+        if ymin is not None and ymax is not None:
+            y = None
+            for field in ["title", "raw_text"]:
+                txt = (row.get(field) or "").strip()
+                m = re.search(r"\b(19\d{2}|20\d{2})\b", txt)
+                if m:
+                    y = int(m.group(1))
+                    break
+            if y is None or not (ymin <= y <= ymax):
+                continue
+        out.append(dict(row, query=query))
+    return out
+
+
+def make_rows(n):
+    rows = []
+    for i in range(n):
+        title = f"{2005 + i % 15} {MODELS[i % len(MODELS)]}"
+        rows.append(
+            {
+                "title": title,
+                "raw_text": f"{title} Row {i % 90} Stock #{100000 + i} Arrived 10/{1 + i % 28}/2026",
+                "link": "https://www.pyp.com/inventory/orlando-1134/",
+            }
+        )
+    return rows
+
+
+def legacy_page(rows):
+    return {q: legacy_filter_rows(rows, q) for q in TARGETS}
+
+
+def spec_page(rows):
+    # What scan_pyp_yard_batch does: prepare the page once, filter per target
+    prepared = app.prepare_filter_rows(rows)
+    return {q: app.filter_pyp_rows(rows, q, prepared) for q in TARGETS}
+
+
+def bench(fn, rows, repeat):
+    """Best-of-repeat cost per (row, target) pair, in nanoseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - start)
+    return best / (len(rows) * len(TARGETS)) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    assert legacy_page(rows) == spec_page(rows)
+
+    spec_cache = app._query_spec_cache()
+    spec_cache["specs"].clear()
+    spec_cache["hits"] = spec_cache["misses"] = 0
+    legacy_ns = bench(legacy_page, rows, args.repeat)
+    spec_ns = bench(spec_page, rows, args.repeat)
+
+    print(f"rows={args.rows} targets={len(TARGETS)} repeat={args.repeat}")
+    print(f"legacy filter   : {legacy_ns:8.1f} ns/row")
+    print(f"QuerySpec filter: {spec_ns:8.1f} ns/row")
+    print(f"speedup         : {legacy_ns / spec_ns:8.2f}x")
+    print(
+        f"compile_query   : {spec_cache['hits']} hits, {spec_cache['misses']} misses, "
+        f"{len(spec_cache['specs'])} cached"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,49 @@
 import streamlit as st
 import requests
-from urllib.parse import quote_plus
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib.parse import parse_qs, quote_plus, urljoin, urlsplit
+from bs4 import BeautifulSoup, SoupStrainer
 import pandas as pd
 import re
-from datetime import datetime
+from datetime import datetime, timezone
+import atexit
+import hashlib
+import html
 import json
 import math
 import os
+import queue
+import sqlite3
 import time
+import threading
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
 
 from io import BytesIO
+from typing import Optional, Tuple
+
+# Worker threads re-attach the script context so st.* calls still render
+try:
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+except ImportError:
+
+    def get_script_run_ctx():
+        return None
+
+    def add_script_run_ctx(thread=None, ctx=None):
+        return thread
+
+
+# Optional headless browser for JS-only yard inventories (U-Pull-&-Pay Orlando)
+try:
+    from playwright.sync_api import sync_playwright
+
+    PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    PLAYWRIGHT_AVAILABLE = False
 
 # Optional: PDF generation for Puller list
 try:
@@ -380,6 +413,560 @@ _header_html = f"""
 
 st.markdown(_header_html, unsafe_allow_html=True)
 
+############################################################
+# HTTP FETCH LAYER
+############################################################
+
+HTTP_USER_AGENT = "Mozilla/5.0"
+HTTP_DEFAULT_TIMEOUT = 20
+
+# Keep-alive pool size per host — roughly how many workers may talk to that
+# host at once. Hosts not listed here share the default pool size.
+HTTP_POOL_SIZES = {
+    "www.pyp.com": 8,
+    "vpic.nhtsa.dot.gov": 8,
+    "www.ebay.com": 8,
+    "serpapi.com": 4,
+    "budgetupullit.com": 4,
+    "budgetupullit.s3softwaresolutions.com": 4,
+    "centralfloridapickandpay.com": 2,
+}
+HTTP_DEFAULT_POOL_SIZE = 4
+
+
+@st.cache_resource
+def get_http_session():
+    """
+    One process-wide requests.Session shared by every scraper (and every
+    Streamlit session), so TCP+TLS connections to pyp.com, NHTSA, eBay, etc.
+    are kept alive and reused instead of re-handshaking on every call.
+    """
+    session = requests.Session()
+    session.headers.update(
+        {
+            "User-Agent": HTTP_USER_AGENT,
+            # gzip/deflate always; brotli too when the brotli package is installed
+            "Accept-Encoding": requests.utils.DEFAULT_ACCEPT_ENCODING,
+        }
+    )
+
+    default_adapter = HTTPAdapter(
+        pool_connections=len(HTTP_POOL_SIZES) + 8,
+        pool_maxsize=HTTP_DEFAULT_POOL_SIZE,
+    )
+    session.mount("https://", default_adapter)
+    session.mount("http://", default_adapter)
+
+    for host, size in HTTP_POOL_SIZES.items():
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=size)
+        session.mount(f"https://{host}", adapter)
+        session.mount(f"http://{host}", adapter)
+
+    return session
+
+
+class SingleFlight:
+    """
+    Process-wide in-flight registry: concurrent calls with the same key join
+    the first caller's work and share its result (or its exception) instead
+    of each making the same outbound request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.joined = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            fut = self._inflight.get(key)
+            leader = fut is None
+            if leader:
+                fut = Future()
+                self._inflight[key] = fut
+            else:
+                self.joined += 1
+        if not leader:
+            return fut.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+
+@st.cache_resource
+def get_singleflight():
+    return SingleFlight()
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of sending a request while that dependency's breaker is open."""
+
+
+# (consecutive failures to open, seconds before a half-open probe) per breaker.
+# Yard breakers are named "yard:<slug>" and use the "yard" defaults.
+BREAKER_SETTINGS = {
+    "ebay-html": (2, 300.0),
+    "serpapi": (3, 120.0),
+    "nhtsa": (3, 60.0),
+    "yard": (3, 60.0),
+}
+BREAKER_DEFAULT_SETTINGS = (3, 60.0)
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open breaker for one upstream. After `failure_threshold`
+    consecutive failures it opens and every call fails fast; once
+    `reset_timeout` has passed a single probe is let through (half-open),
+    which closes the breaker on success or re-opens it on failure.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, name, failure_threshold=3, reset_timeout=60.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self.short_circuited = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    self.short_circuited += 1
+                    return False
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN:
+                if self._probing:
+                    self.short_circuited += 1
+                    return False
+                self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.trips += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._probing = False
+
+
+@st.cache_resource
+def _breaker_registry():
+    return {"lock": threading.Lock(), "breakers": {}}
+
+
+def get_breaker(name):
+    """Process-wide breaker by name: "ebay-html", "serpapi", "nhtsa", "yard:<slug>"."""
+    reg = _breaker_registry()
+    with reg["lock"]:
+        b = reg["breakers"].get(name)
+        if b is None:
+            group = name.split(":", 1)[0]
+            threshold, reset = BREAKER_SETTINGS.get(group, BREAKER_DEFAULT_SETTINGS)
+            b = CircuitBreaker(name, threshold, reset)
+            reg["breakers"][name] = b
+        return b
+
+
+def breaker_snapshot():
+    reg = _breaker_registry()
+    with reg["lock"]:
+        breakers = list(reg["breakers"].values())
+    return [
+        {
+            "breaker": b.name,
+            "state": b.state,
+            "failures": b.failures,
+            "trips": b.trips,
+            "skipped": b.short_circuited,
+        }
+        for b in sorted(breakers, key=lambda b: b.name)
+    ]
+
+
+# Sustained requests/second per host. Yard hosts take their defaults from
+# the yard adapters (see YardAdapter.rate_limit). Override or add hosts with
+# a "rate_limits" map in yards_config.json, e.g. {"www.pyp.com": 2}.
+HTTP_RATE_LIMITS = {
+    "vpic.nhtsa.dot.gov": 5.0,
+    "www.ebay.com": 1.0,
+    "serpapi.com": 2.0,
+}
+HTTP_DEFAULT_RATE = 4.0
+# Hosts that answer throttling with a captcha page instead of a 429
+CAPTCHA_HOSTS = {"www.ebay.com"}
+# Never back off below this fraction of a host's configured rate
+RATE_FLOOR_FRACTION = 0.05
+# Longest pause honoured from a Retry-After header, in seconds
+RETRY_AFTER_MAX = 120.0
+
+
+def parse_retry_after(value):
+    """
+    Seconds to wait from a Retry-After header (delta-seconds or HTTP-date),
+    clamped to RETRY_AFTER_MAX. None when missing or unparseable, so the
+    caller falls back to its default backoff.
+    """
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when is None:
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        seconds = (when - datetime.now(timezone.utc)).total_seconds()
+    if seconds != seconds or seconds <= 0:  # NaN or already past
+        return None
+    return min(seconds, RETRY_AFTER_MAX)
+
+
+class TokenBucket:
+    """
+    Token bucket for one host with adaptive backoff: a throttled response
+    halves the rate and pauses the host, then each success recovers 10% of
+    the configured rate until it is back to normal.
+    """
+
+    def __init__(self, rate):
+        self.base_rate = float(rate)
+        self.rate = float(rate)
+        self.capacity = max(1.0, self.base_rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.throttle_events = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                wait = max(self.paused_until - now, (1.0 - self.tokens) / self.rate)
+            time.sleep(min(max(wait, 0.01), 5.0))
+
+    def throttled(self, retry_after=None):
+        with self._lock:
+            self.throttle_events += 1
+            self.rate = max(self.base_rate * RATE_FLOOR_FRACTION, self.rate / 2.0)
+            self.tokens = 0.0
+            if retry_after:
+                pause = min(retry_after, RETRY_AFTER_MAX)
+            else:
+                pause = 1.0 / self.rate
+            self.paused_until = max(self.paused_until, time.monotonic() + pause)
+
+    def succeeded(self):
+        with self._lock:
+            if self.rate < self.base_rate:
+                self.rate = min(self.base_rate, self.rate + self.base_rate * 0.1)
+
+
+class HostRateLimiter:
+    """Per-host TokenBuckets, created on first use from the configured rates."""
+
+    def __init__(self, rates=None):
+        self.rates = dict(HTTP_RATE_LIMITS)
+        self.rates.update(rates or {})
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, host):
+        with self._lock:
+            b = self._buckets.get(host)
+            if b is None:
+                b = TokenBucket(self.rates.get(host, HTTP_DEFAULT_RATE))
+                self._buckets[host] = b
+            return b
+
+    def acquire(self, host):
+        self.bucket(host).acquire()
+
+    def report(self, host, response):
+        """
+        Back off on 429/503 (honouring Retry-After) or a captcha page.
+        Returns True when the response was a throttling signal.
+        """
+        b = self.bucket(host)
+        throttled = response.status_code in (429, 503)
+        if not throttled and host in CAPTCHA_HOSTS:
+            throttled = "captcha" in response.text.lower()
+        if not throttled:
+            b.succeeded()
+            return False
+        b.throttled(parse_retry_after(response.headers.get("Retry-After")))
+        return True
+
+    def snapshot(self):
+        with self._lock:
+            buckets = list(self._buckets.items())
+        return [
+            {
+                "host": host,
+                "rate_per_s": round(b.rate, 2),
+                "configured": b.base_rate,
+                "throttled": b.throttle_events,
+            }
+            for host, b in sorted(buckets)
+        ]
+
+
+def load_rate_limits(path="yards_config.json"):
+    """Optional {"host": requests_per_second} overrides from the yards config."""
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+        return {str(k): float(v) for k, v in (data.get("rate_limits") or {}).items()}
+    except Exception:
+        return {}
+
+
+@st.cache_resource
+def get_rate_limiter():
+    rates = yard_adapter_rate_limits()
+    rates.update(load_rate_limits())
+    return HostRateLimiter(rates)
+
+
+@st.cache_resource
+def _host_gate_registry():
+    return {"lock": threading.Lock(), "gates": {}}
+
+
+def host_gate(url):
+    """
+    Process-wide semaphore capping concurrent requests to one host at its
+    pool size, whichever worker pool (scan, eBay enrichment, ...) they come from.
+    """
+    host = urlsplit(url).hostname or ""
+    reg = _host_gate_registry()
+    with reg["lock"]:
+        gate = reg["gates"].get(host)
+        if gate is None:
+            size = HTTP_POOL_SIZES.get(host, HTTP_DEFAULT_POOL_SIZE)
+            gate = threading.BoundedSemaphore(size)
+            reg["gates"][host] = gate
+    return gate
+
+
+def _send(method, url, timeout=None, breaker=None, session=None, **kwargs):
+    """
+    One request through the shared session: fail fast if the named circuit
+    breaker is open, wait for the host's rate-limit token, hold its
+    concurrency gate, then feed throttling signals back to the limiter and
+    the outcome (errors, 5xx, throttling) back to the breaker. `session`
+    overrides the shared session (e.g. a scraper that needs its own cookies).
+    """
+    cb = get_breaker(breaker) if breaker else None
+    if cb is not None and not cb.allow():
+        raise CircuitOpenError(f"{breaker} circuit open; skipping {url}")
+
+    host = urlsplit(url).hostname or ""
+    limiter = get_rate_limiter()
+    healthy = False
+    try:
+        limiter.acquire(host)
+        with host_gate(url):
+            r = (session or get_http_session()).request(
+                method, url, timeout=timeout or HTTP_DEFAULT_TIMEOUT, **kwargs
+            )
+        throttled = limiter.report(host, r)
+        healthy = not throttled and r.status_code < 500
+    finally:
+        # Any exception counts as a failure too; otherwise a half-open
+        # probe that raised would leave the breaker probing forever.
+        if cb is not None:
+            if healthy:
+                cb.record_success()
+            else:
+                cb.record_failure()
+    return r
+
+
+def http_get(url, timeout=None, breaker=None, **kwargs):
+    """
+    GET through the shared keep-alive session (default headers + timeout).
+    Identical GETs already in flight (same URL and arguments, from any
+    session) join that request and share its response. `breaker` names the
+    CircuitBreaker guarding this upstream; while it is open the call raises
+    CircuitOpenError without touching the network.
+    """
+    key = ("GET", url, repr(sorted((k, repr(v)) for k, v in kwargs.items())))
+    return get_singleflight().do(
+        key, lambda: _send("GET", url, timeout=timeout, breaker=breaker, **kwargs)
+    )
+
+
+def http_post(url, timeout=None, breaker=None, **kwargs):
+    """POST through the shared keep-alive session (default headers + timeout)."""
+    return _send("POST", url, timeout=timeout, breaker=breaker, **kwargs)
+
+
+def http_pool_stats():
+    """
+    Connection-reuse counters per host from the shared session's urllib3 pools.
+    Returns a list of dicts: host, requests, connections, reused.
+    """
+    per_host = {}
+    session = get_http_session()
+    for adapter in {id(a): a for a in session.adapters.values()}.values():
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            try:
+                pool = pools[key]
+            except KeyError:
+                continue
+            entry = per_host.setdefault(
+                pool.host, {"host": pool.host, "requests": 0, "connections": 0}
+            )
+            entry["requests"] += pool.num_requests
+            entry["connections"] += pool.num_connections
+
+    out = []
+    for entry in per_host.values():
+        entry["reused"] = max(0, entry["requests"] - entry["connections"])
+        out.append(entry)
+    return sorted(out, key=lambda e: e["host"])
+
+############################################################
+# HTML PARSING
+############################################################
+
+try:
+    import lxml  # noqa: F401  (optional; much faster tree builder than html.parser)
+
+    _DEFAULT_HTML_PARSER = "lxml"
+except ImportError:
+    _DEFAULT_HTML_PARSER = "html.parser"
+
+# BeautifulSoup backend for every scraper. Set HTML_PARSER=html.parser to
+# compare against the pure-Python parser in the Network stats timings.
+PARSER_BACKEND = os.environ.get("HTML_PARSER", _DEFAULT_HTML_PARSER)
+
+# Only build the subtree each scraper reads (everything else is skipped
+# while parsing, including <head>, scripts and page chrome).
+PYP_CARD_STRAINER = SoupStrainer(["div", "article", "li", "a"])
+S3_FORM_STRAINER = SoupStrainer("input")
+S3_TABLE_STRAINER = SoupStrainer("table")
+EBAY_PRICE_CLASS_STRAINER = SoupStrainer(
+    attrs={"class": re.compile(r"s-item__price|x-price-approx__price")}
+)
+EBAY_ITEMPROP_PRICE_STRAINER = SoupStrainer(attrs={"itemprop": "price"})
+
+
+class ParseStats:
+    """Per-scraper parse timings (pages, bytes, seconds), process-wide."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, label, nbytes, seconds):
+        with self._lock:
+            e = self._stats.setdefault(label, [0, 0, 0.0])
+            e[0] += 1
+            e[1] += nbytes
+            e[2] += seconds
+
+    def snapshot(self):
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._stats.items())
+        return [
+            {
+                "scraper": label,
+                "parser": PARSER_BACKEND,
+                "pages": pages,
+                "avg_kb": round(nbytes / pages / 1024, 1),
+                "avg_ms": round(seconds / pages * 1000, 1),
+            }
+            for label, (pages, nbytes, seconds) in items
+        ]
+
+
+@st.cache_resource
+def get_parse_stats():
+    return ParseStats()
+
+
+def make_soup(markup, parse_only=None, label="other"):
+    """
+    BeautifulSoup with the configured backend, optionally restricted to a
+    SoupStrainer subtree. Parse time is recorded under `label`.
+    """
+    t0 = time.perf_counter()
+    soup = BeautifulSoup(markup, PARSER_BACKEND, parse_only=parse_only)
+    get_parse_stats().record(label, len(markup), time.perf_counter() - t0)
+    return soup
+
+# DOM-free text extraction for pages we only scan as plain text
+# (Budget U-Pull-It, Central Florida Pick & Pay): no tree is built at all.
+_HTML_SKIP_RE = re.compile(
+    r"<!--.*?-->|<(script|style|template)\b[^>]*>.*?</\1\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+_HTML_TAG_RE = re.compile(r"<[/!?a-zA-Z](?:\"[^\"]*\"|'[^']*'|[^'\">])*>")
+
+
+def html_to_text(markup, label="other"):
+    """
+    Visible text of an HTML page, one text node per line -- the same shape as
+    BeautifulSoup's get_text("\\n", strip=True) -- using regexes only.
+    Scripts, styles, templates and comments are dropped; entities unescaped.
+    """
+    t0 = time.perf_counter()
+    body = _HTML_SKIP_RE.sub("<br>", markup)
+    lines = []
+    for chunk in _HTML_TAG_RE.split(body):
+        chunk = html.unescape(chunk).strip()
+        if chunk:
+            lines.append(chunk)
+    text = "\n".join(lines)
+    get_parse_stats().record(f"{label} (text)", len(markup), time.perf_counter() - t0)
+    return text
+
+
 ############################################################
 # HELPERS
 ############################################################
@@ -577,63 +1164,567 @@ def parse_budget_make_model(query: str):
     return make, model
 
 
+# --- Offline VIN pre-decoding (check digit, model year, WMI) ---
+
+# Position weights and letter values for the position-9 check digit (49 CFR 565)
+_VIN_WEIGHTS = (8, 7, 6, 5, 4, 3, 2, 10, 0, 9, 8, 7, 6, 5, 4, 3, 2)
+_VIN_VALUES = {
+    **{str(d): d for d in range(10)},
+    **dict(zip("ABCDEFGH", range(1, 9))),
+    **dict(zip("JKLMN", range(1, 6))),
+    "P": 7,
+    "R": 9,
+    **dict(zip("STUVWXYZ", range(2, 10))),
+}
+# Position-10 model year codes; the cycle repeats every 30 years
+_VIN_YEAR_CODES = "ABCDEFGHJKLMNPRSTVWXY123456789"
+
+# World Manufacturer Identifier (VIN positions 1-3) -> make, spelled the way
+# vPIC returns it. Only WMIs that map to a single make are listed: shared
+# ones (1C3/2C3 Chrysler+Dodge, JN1/JN8/5N1 Nissan+Infiniti, KMH
+# Hyundai+Genesis, 3KP and 5XY Kia+Hyundai, JF1 Subaru+Scion/Toyota, JTN
+# Toyota+Scion, 3N6 Nissan+Chevrolet, 1D7/1C6/3C6 Dodge+Ram) are left out
+# so the make is never guessed.
+VIN_WMI_MAKES = {
+    "19U": "ACURA", "JH4": "ACURA",
+    "1HG": "HONDA", "2HG": "HONDA", "3HG": "HONDA", "2HK": "HONDA",
+    "5FN": "HONDA", "5FP": "HONDA", "5J6": "HONDA", "JHM": "HONDA",
+    "19X": "HONDA", "SHH": "HONDA",
+    "4T1": "TOYOTA", "4T3": "TOYOTA", "4T4": "TOYOTA", "5TD": "TOYOTA",
+    "5TF": "TOYOTA", "5TB": "TOYOTA", "5YF": "TOYOTA", "2T1": "TOYOTA",
+    "2T3": "TOYOTA", "3TM": "TOYOTA", "JTD": "TOYOTA", "JTE": "TOYOTA",
+    "JTM": "TOYOTA",
+    "JTH": "LEXUS", "JTJ": "LEXUS", "2T2": "LEXUS", "58A": "LEXUS",
+    "1N4": "NISSAN", "1N6": "NISSAN", "3N1": "NISSAN",
+    "JNK": "INFINITI", "JNR": "INFINITI", "5N3": "INFINITI",
+    "JM1": "MAZDA", "JM3": "MAZDA", "3MZ": "MAZDA", "3MV": "MAZDA",
+    "KNA": "KIA", "KND": "KIA", "5XX": "KIA",
+    "KM8": "HYUNDAI", "5NP": "HYUNDAI", "5NM": "HYUNDAI",
+    "KMT": "GENESIS",
+    "1FA": "FORD", "1FM": "FORD", "1FT": "FORD", "1FD": "FORD",
+    "2FM": "FORD", "3FA": "FORD", "3FM": "FORD", "1ZV": "FORD", "NM0": "FORD",
+    "1LN": "LINCOLN", "2LM": "LINCOLN", "5LM": "LINCOLN", "3LN": "LINCOLN",
+    "1G1": "CHEVROLET", "1GC": "CHEVROLET", "1GN": "CHEVROLET",
+    "2G1": "CHEVROLET", "3G1": "CHEVROLET", "3GN": "CHEVROLET",
+    "3GC": "CHEVROLET", "KL1": "CHEVROLET", "KL8": "CHEVROLET",
+    "1GT": "GMC", "2GT": "GMC", "3GT": "GMC", "1GK": "GMC", "2GK": "GMC",
+    "3GK": "GMC",
+    "1G4": "BUICK", "2G4": "BUICK", "5GA": "BUICK", "KL4": "BUICK",
+    "1G6": "CADILLAC", "1GY": "CADILLAC",
+    "1G2": "PONTIAC", "2G2": "PONTIAC", "5Y2": "PONTIAC",
+    "1G8": "SATURN", "5GZ": "SATURN",
+    "1B3": "DODGE", "2B3": "DODGE", "2D4": "DODGE",
+    "1J4": "JEEP", "1J8": "JEEP",
+    "JF2": "SUBARU", "4S3": "SUBARU", "4S4": "SUBARU",
+    "JA3": "MITSUBISHI", "JA4": "MITSUBISHI", "4A3": "MITSUBISHI",
+    "4A4": "MITSUBISHI", "ML3": "MITSUBISHI",
+    "3VW": "VOLKSWAGEN", "WVW": "VOLKSWAGEN", "WVG": "VOLKSWAGEN",
+    "1VW": "VOLKSWAGEN", "3VV": "VOLKSWAGEN",
+    "WAU": "AUDI", "WA1": "AUDI",
+    "WBA": "BMW", "WBS": "BMW", "WBX": "BMW", "5UX": "BMW", "4US": "BMW",
+    "WDB": "MERCEDES-BENZ", "WDC": "MERCEDES-BENZ", "WDD": "MERCEDES-BENZ",
+    "4JG": "MERCEDES-BENZ", "55S": "MERCEDES-BENZ", "W1K": "MERCEDES-BENZ",
+    "W1N": "MERCEDES-BENZ",
+    "YV1": "VOLVO", "YV4": "VOLVO",
+    "WMW": "MINI",
+    "SAJ": "JAGUAR",
+    "SAL": "LAND ROVER",
+    "WP0": "PORSCHE", "WP1": "PORSCHE",
+    "5YJ": "TESLA", "7SA": "TESLA",
+    "JS2": "SUZUKI", "JS3": "SUZUKI", "2S3": "SUZUKI",
+    "YS3": "SAAB",
+}  # fmt: skip
+
+
+def vin_check_digit_ok(vin: str) -> bool:
+    """True if a 17-character VIN's position-9 check digit is correct."""
+    vin = (vin or "").strip().upper()
+    if len(vin) != 17:
+        return False
+    try:
+        total = sum(_VIN_VALUES[ch] * w for ch, w in zip(vin, _VIN_WEIGHTS))
+    except KeyError:
+        # I, O, Q or other characters that never appear in a real VIN
+        return False
+    expected = total % 11
+    return vin[8] == ("X" if expected == 10 else str(expected))
+
+
+def vin_model_year(vin: str):
+    """
+    Model year from position 10. Position 7 picks the 30-year cycle: a letter
+    means 2010-2039, a digit means 1980-2009 (cars and light trucks).
+    """
+    vin = (vin or "").strip().upper()
+    if len(vin) != 17:
+        return None
+    idx = _VIN_YEAR_CODES.find(vin[9])
+    if idx < 0:
+        return None
+    return 1980 + idx + (30 if vin[6].isalpha() else 0)
+
+
+def predecode_vin(vin: str) -> dict:
+    """
+    Everything we can learn about a VIN without the network.
+    Returns {"valid": bool, "year": int|None, "make": str|None}.
+    """
+    vin = (vin or "").strip().upper()
+    if not vin_check_digit_ok(vin):
+        return {"valid": False, "year": None, "make": None}
+    return {
+        "valid": True,
+        "year": vin_model_year(vin),
+        "make": VIN_WMI_MAKES.get(vin[:3]),
+    }
+
+
+def find_vin(text: str):
+    """First VIN_PATTERN match in text that also passes the check digit."""
+    for m in VIN_PATTERN.finditer(text or ""):
+        if vin_check_digit_ok(m.group(0)):
+            return m.group(0)
+    return None
+
+
+def vin_fails_prefilter(vin: str, ymin=None, ymax=None, make=None) -> bool:
+    """
+    Cheap offline rejection before any NHTSA call: bad check digit, a local
+    model year outside [ymin, ymax], or a WMI make that can't match `make`.
+    Unknown year/make never rejects.
+    """
+    pre = predecode_vin(vin)
+    if not pre["valid"]:
+        return True
+    y = pre["year"]
+    if ymin is not None and ymax is not None and y is not None:
+        if not (ymin <= y <= ymax):
+            return True
+    if make and pre["make"] and make.upper() not in pre["make"]:
+        return True
+    return False
+
+
+def _empty_vin_info():
+    return {
+        "year": None,
+        "make": None,
+        "model": None,
+        "engine": None,
+        "drive": "",
+    }
+
+
+def _sqlite_connect(path):
+    """
+    Open a SQLite connection in WAL mode, so many readers (threads or
+    Streamlit sessions) never block behind a single writer.
+    """
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class _SqliteStore:
+    """Shared plumbing for our SQLite-backed caches: one connection per thread."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = _sqlite_connect(self.path)
+            self._local.conn = conn
+        return conn
+
+
+VIN_CACHE_PATH = "vin_decode_cache.sqlite3"
+VIN_CACHE_LRU_SIZE = 5000
+# Re-check squish-VIN answers against NHTSA in the background (off by default)
+VIN_SQUISH_VERIFY = os.environ.get("VIN_SQUISH_VERIFY", "").lower() in ("1", "true", "yes")
+
+
+def squish_vin(vin: str):
+    """
+    Squish VIN: positions 1-8 plus the position-10 year code. Vehicles that
+    share it decode to the same year/make/model/engine/drive.
+    """
+    vin = (vin or "").strip().upper()
+    if len(vin) != 17:
+        return None
+    return vin[:8] + vin[9]
+
+
+class VinDecodeCache(_SqliteStore):
+    """
+    Persistent VIN -> decoded dict (year/make/model/engine/drive), also
+    indexed by squish VIN so unseen VINs from a known prefix decode locally.
+
+    A VIN decode never changes, so entries never expire. An in-process LRU sits
+    in front of two SQLite tables; each thread gets its own connection.
+    `stats` counts exact hits, squish hits and network decodes.
+    """
+
+    def __init__(self, path=VIN_CACHE_PATH, lru_size=VIN_CACHE_LRU_SIZE):
+        super().__init__(path)
+        self.lru_size = lru_size
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            "vin_hits": 0,
+            "squish_hits": 0,
+            "network_decodes": 0,
+            "squish_verified": 0,
+            "squish_mismatches": 0,
+        }
+        try:
+            with self._conn() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS vin_decodes ("
+                    "vin TEXT PRIMARY KEY, data TEXT NOT NULL, decoded_at REAL NOT NULL)"
+                )
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS squish_decodes ("
+                    "squish TEXT PRIMARY KEY, data TEXT NOT NULL, decoded_at REAL NOT NULL)"
+                )
+        except sqlite3.Error:
+            # Disk cache is best effort; the LRU still works without it
+            pass
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.stats[name] = self.stats.get(name, 0) + n
+
+    def stats_snapshot(self):
+        with self._lock:
+            return dict(self.stats)
+
+    def _remember(self, key, info):
+        with self._lock:
+            self._lru[key] = info
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+
+    def _get(self, table, column, key, lru_key):
+        with self._lock:
+            info = self._lru.get(lru_key)
+            if info is not None:
+                self._lru.move_to_end(lru_key)
+                return dict(info)
+        try:
+            row = (
+                self._conn()
+                .execute(f"SELECT data FROM {table} WHERE {column} = ?", (key,))
+                .fetchone()
+            )
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        info = json.loads(row[0])
+        self._remember(lru_key, info)
+        return dict(info)
+
+    def _put(self, table, column, key, lru_key, info):
+        self._remember(lru_key, dict(info))
+        try:
+            with self._conn() as conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {table} ({column}, data, decoded_at) "
+                    "VALUES (?, ?, ?)",
+                    (key, json.dumps(info), time.time()),
+                )
+        except sqlite3.Error:
+            pass
+
+    def get(self, vin):
+        return self._get("vin_decodes", "vin", vin, vin)
+
+    def get_squish(self, squish):
+        return self._get("squish_decodes", "squish", squish, "squish:" + squish)
+
+    def put(self, vin, info):
+        self._put("vin_decodes", "vin", vin, vin, info)
+        squish = squish_vin(vin)
+        # Only index complete decodes by prefix; a partial answer shouldn't
+        # be handed to every other VIN that shares it.
+        if squish and info.get("year") and info.get("make") and info.get("model"):
+            self._put("squish_decodes", "squish", squish, "squish:" + squish, info)
+
+
+@st.cache_resource
+def get_vin_cache():
+    return VinDecodeCache()
+
+
+@st.cache_resource
+def _squish_verify_pool():
+    return ThreadPoolExecutor(max_workers=2)
+
+
+def _verify_squish_decode(vin, squish_info):
+    """Background check of a squish-VIN answer against NHTSA."""
+    info = _fetch_vin_nhtsa(vin)
+    if info is None:
+        return
+    cache = get_vin_cache()
+    cache.count("squish_verified")
+    if info != squish_info:
+        cache.count("squish_mismatches")
+    # The VIN's own decode always wins from now on
+    cache.put(vin, info)
+
+
+def _lookup_vin_local(vin):
+    """
+    Answer a (normalized) VIN from the cache: exact VIN first, then squish VIN.
+    Returns the info dict or None.
+    """
+    cache = get_vin_cache()
+    info = cache.get(vin)
+    if info is not None:
+        cache.count("vin_hits")
+        return info
+
+    squish = squish_vin(vin)
+    info = cache.get_squish(squish) if squish else None
+    if info is not None:
+        cache.count("squish_hits")
+        if VIN_SQUISH_VERIFY:
+            _squish_verify_pool().submit(_verify_squish_decode, vin, dict(info))
+        return info
+    return None
+
+
+def vin_decode_stats_delta(before, after):
+    """Per-scan decode counters from two VinDecodeCache.stats_snapshot() calls."""
+    return {k: after.get(k, 0) - before.get(k, 0) for k in after}
+
+
 def decode_vin_nhtsa(vin: str):
     """
     Decode VIN using NHTSA API.
     Returns: year, make, model, engine, drive (some may be None/"").
+
+    Decodes are cached per VIN and per squish VIN (memory +
+    vin_decode_cache.sqlite3), so a VIN already seen in any earlier scan, or
+    one sharing a known prefix + year code, costs no network call.
     """
-    vin = vin.strip()
+    vin = vin.strip().upper()
     if len(vin) < 11:
-        return {
-            "year": None,
-            "make": None,
-            "model": None,
-            "engine": None,
-            "drive": "",
-        }
+        return _empty_vin_info()
+
+    # Full-length strings with a bad check digit aren't VINs: skip the network
+    pre = predecode_vin(vin) if len(vin) == 17 else None
+    if pre is not None and not pre["valid"]:
+        return _empty_vin_info()
+
+    cached = _lookup_vin_local(vin)
+    if cached is not None:
+        return cached
+
+    cache = get_vin_cache()
+    cache.count("network_decodes")
+    info = _fetch_vin_nhtsa(vin)
+    if info is None:
+        # Network/API failure: don't cache, so the next scan retries.
+        # Year/make can still come from the VIN itself.
+        info = _empty_vin_info()
+        if pre is not None:
+            info["year"] = pre["year"]
+            info["make"] = pre["make"]
+        return info
+    cache.put(vin, info)
+    return info
+
+
+# vPIC base URL; point NHTSA_VPIC_BASE at a local stub server to work offline
+NHTSA_VPIC_BASE = os.environ.get(
+    "NHTSA_VPIC_BASE", "https://vpic.nhtsa.dot.gov/api/vehicles"
+).rstrip("/")
+# DecodeVINValuesBatch accepts at most 50 VINs per POST
+NHTSA_BATCH_SIZE = 50
+
+
+def _normalize_vpic_result(res: dict) -> dict:
+    """Turn one vPIC 'Results' entry into our year/make/model/engine/drive dict."""
+    year = res.get("ModelYear") or None
+    make = res.get("Make") or None
+    model = res.get("Model") or None
+
+    # Engine info: may appear in different fields
+    engine = res.get("EngineModel") or ""
+    if not engine:
+        disp_l = res.get("DisplacementL") or ""
+        cyl = res.get("EngineCylinders") or ""
+        engine = f"{disp_l}L {cyl}cyl".strip()
+
+    # Drivetrain info
+    raw_drive = (
+        res.get("DriveType")
+        or res.get("DriveTypePrimary")
+        or res.get("Drive Type")
+        or res.get("Drive")
+        or ""
+    )
+    drive = normalize_drive_label(raw_drive)
+
+    return {
+        "year": int(year) if (year and year.isdigit()) else None,
+        "make": make,
+        "model": model,
+        "engine": engine or None,
+        "drive": drive,
+    }
+
 
-    url = f"https://vpic.nhtsa.dot.gov/api/vehicles/decodevinvalues/{vin}?format=json"
+def _fetch_vin_nhtsa(vin: str):
+    """
+    One vPIC decodevinvalues call. Returns the normalized dict, or None on
+    any network/API failure.
+    """
+    url = f"{NHTSA_VPIC_BASE}/decodevinvalues/{vin}?format=json"
     try:
-        r = requests.get(url, timeout=10)
+        r = http_get(url, timeout=10, breaker="nhtsa")
+        r.raise_for_status()
         data = r.json()
         res = (data.get("Results") or [{}])[0]
+        return _normalize_vpic_result(res)
+    except Exception:
+        return None
 
-        year = res.get("ModelYear") or None
-        make = res.get("Make") or None
-        model = res.get("Model") or None
-
-        # Engine info: may appear in different fields
-        engine = res.get("EngineModel") or ""
-        if not engine:
-            disp_l = res.get("DisplacementL") or ""
-            cyl = res.get("EngineCylinders") or ""
-            engine = f"{disp_l}L {cyl}cyl".strip()
-
-        # Drivetrain info
-        raw_drive = (
-            res.get("DriveType")
-            or res.get("DriveTypePrimary")
-            or res.get("Drive Type")
-            or res.get("Drive")
-            or ""
-        )
-        drive = normalize_drive_label(raw_drive)
 
-        return {
-            "year": int(year) if (year and year.isdigit()) else None,
-            "make": make,
-            "model": model,
-            "engine": engine or None,
-            "drive": drive,
-        }
+def _fetch_vins_batch_nhtsa(vins):
+    """
+    One DecodeVINValuesBatch POST for up to NHTSA_BATCH_SIZE VINs.
+    Returns {VIN: normalized dict}, or None if the request failed.
+    """
+    url = f"{NHTSA_VPIC_BASE}/DecodeVINValuesBatch/"
+    try:
+        r = http_post(
+            url,
+            data={"format": "json", "data": ";".join(vins)},
+            timeout=20,
+            breaker="nhtsa",
+        )
+        r.raise_for_status()
+        data = r.json()
+        out = {}
+        for res in data.get("Results") or []:
+            vin = (res.get("VIN") or "").strip().upper()
+            if vin:
+                out[vin] = _normalize_vpic_result(res)
+        return out
     except Exception:
-        return {
-            "year": None,
-            "make": None,
-            "model": None,
-            "engine": None,
-            "drive": "",
-        }
+        return None
+
+
+def decode_vins_batch(vins):
+    """
+    Decode many VINs at once. Cached VINs are answered locally; the rest go
+    to vPIC's batch endpoint, NHTSA_BATCH_SIZE per POST. If a batch request
+    fails (or leaves a VIN out), those VINs fall back to single decodes.
+
+    Returns {vin: info} keyed by the VIN strings passed in.
+    """
+    out = {}
+    misses = {}
+    cache = get_vin_cache()
+    for vin in vins:
+        if not vin or vin in out:
+            continue
+        key = vin.strip().upper()
+        if len(key) < 11 or (len(key) == 17 and not vin_check_digit_ok(key)):
+            out[vin] = _empty_vin_info()
+            continue
+        if key in misses:
+            misses[key].append(vin)
+            continue
+        cached = _lookup_vin_local(key)
+        if cached is not None:
+            out[vin] = cached
+        else:
+            misses[key] = [vin]
+
+    # Only one VIN per squish key goes to NHTSA; the others reuse its answer
+    keys = []
+    followers = {}
+    rep_for_squish = {}
+    for key in misses:
+        squish = squish_vin(key)
+        rep = rep_for_squish.get(squish) if squish else None
+        if rep is not None:
+            followers[rep].append(key)
+        else:
+            if squish:
+                rep_for_squish[squish] = key
+            followers[key] = []
+            keys.append(key)
+
+    for i in range(0, len(keys), NHTSA_BATCH_SIZE):
+        chunk = keys[i : i + NHTSA_BATCH_SIZE]
+        results = _fetch_vins_batch_nhtsa(chunk) or {}
+        cache.count("network_decodes", sum(1 for key in chunk if key in results))
+        for key in chunk:
+            info = results.get(key)
+            if info is None:
+                info = decode_vin_nhtsa(key)
+            else:
+                cache.put(key, info)
+            for vin in misses[key]:
+                out[vin] = dict(info)
+
+            complete = info.get("year") and info.get("make") and info.get("model")
+            for other in followers[key]:
+                if complete:
+                    cache.count("squish_hits")
+                    other_info = dict(info)
+                    if VIN_SQUISH_VERIFY:
+                        _squish_verify_pool().submit(
+                            _verify_squish_decode, other, dict(info)
+                        )
+                else:
+                    other_info = decode_vin_nhtsa(other)
+                for vin in misses[other]:
+                    out[vin] = dict(other_info)
+    return out
+
+
+def apply_vin_decodes(rows):
+    """
+    Batch-decode row["vin"] for every row and fill the dec_* fields in place.
+    A decoded drivetrain overrides the text-based guess.
+    """
+    infos = decode_vins_batch([row.get("vin") for row in rows if row.get("vin")])
+    for row in rows:
+        info = infos.get(row.get("vin"))
+        if not info:
+            continue
+        row["dec_year"] = info["year"]
+        row["dec_make"] = info["make"]
+        row["dec_model"] = info["model"]
+        row["dec_engine"] = info["engine"]
+        row["dec_drive"] = info.get("drive", "") or ""
+        if row["dec_drive"]:
+            row["drivetrain"] = row["dec_drive"]
+    return rows
+
+
+def decode_pending_rows(rows):
+    """
+    Decode rows that a yard scan left with only the offline pre-decode
+    (dec_pending=True, past the scan's decode_limit). Returns those rows.
+    """
+    pending = [row for row in rows if row.get("dec_pending")]
+    if pending:
+        apply_vin_decodes(pending)
+        for row in pending:
+            row["dec_pending"] = False
+    return pending
 
 
 def clean_query_for_search(query: str) -> str:
@@ -659,11 +1750,6 @@ def clean_query_for_search(query: str) -> str:
     return " ".join(kept)
 
 
-def build_url(slug: str, query: str) -> str:
-    clean = clean_query_for_search(query)
-    return f"https://www.pyp.com/inventory/{slug}/?search={quote_plus(clean)}"
-
-
 def extract_keywords(query: str):
     """
     Keywords used to check make/model match in row text.
@@ -690,12 +1776,28 @@ def extract_keywords(query: str):
     return out
 
 
+YEAR_RE = re.compile(r"\b(19\d{2}|20\d{2})\b")
+
+# Drivetrain tokens in priority order: the first one found wins, wherever it is
+DRIVE_PATTERNS = [
+    (kw, re.compile(rf"\b{kw}\b", re.I)) for kw in ("AWD", "4WD", "4x4", "FWD", "RWD")
+]
+
+
+def detect_drive(text):
+    """First drivetrain token (AWD, 4WD, 4x4, FWD, RWD) mentioned in text, or ''."""
+    for kw, pat in DRIVE_PATTERNS:
+        if pat.search(text):
+            return kw
+    return ""
+
+
 def parse_year_range(query: str):
     """
     From '2011-2013 Kia Sorento' or '2011 2013 Kia Sorento'
     return (min_year, max_year) or (None, None) if no years.
     """
-    years = [int(y) for y in re.findall(r"\b(19\d{2}|20\d{2})\b", query)]
+    years = [int(y) for y in YEAR_RE.findall(query)]
     if not years:
         return None, None
     if len(years) == 1:
@@ -709,7 +1811,7 @@ def extract_year_from_row(row: dict):
     """
     for field in ["title", "raw_text"]:
         txt = (row.get(field) or "").strip()
-        m = re.search(r"\b(19\d{2}|20\d{2})\b", txt)
+        m = YEAR_RE.search(txt)
         if m:
             try:
                 return int(m.group(1))
@@ -718,16 +1820,165 @@ def extract_year_from_row(row: dict):
     return None
 
 
-def expand_variant_lines(lines):
+# Engine variant tokens that pyp.com search doesn't need: displacement
+# ("2.5L"), cylinder counts ("4cyl", "6 cylinder") and explicit layouts
+# (V6/V8/V10/V12, I4/I6). Targets differing only in these share one search.
+# Anything else ("V70", "I35", "i3") is a model name and is kept.
+ENGINE_VARIANT_RE = re.compile(
+    r"\b\d\.\d\s*l?\b"
+    r"|\bv-?(?:6|8|10|12)\b"
+    r"|\bi-?[46]\b"
+    r"|\b\d{1,2}\s*-?\s*cyl(?:inders?)?\b",
+    re.I,
+)
+
+
+def fused_search_text(query: str) -> str:
     """
-    Expand lines with the pattern:
-      '<base> : v1, v2, v3'
-    or:
-      '<base> : v1/v2/v3'
-    into:
-      '<base> v1'
-      '<base> v2'
-      '<base> v3'
+    pyp.com search text with engine variants removed as well (see
+    ENGINE_VARIANT_RE). If that would leave no more than the make, e.g.
+    "BMW i4", the variant was the model and the plain search text is used.
+    """
+    plain = clean_query_for_search(query)
+    fused = clean_query_for_search(ENGINE_VARIANT_RE.sub(" ", query))
+    if fused != plain and len(fused.split()) < 2:
+        return plain
+    return fused
+
+
+@dataclass(frozen=True)
+class QuerySpec:
+    """
+    Everything the adapters and filters derive from one target string,
+    computed once by compile_query() and shared across yards and reruns.
+    """
+
+    query: str
+    keywords: Tuple[str, ...]
+    ymin: Optional[int]
+    ymax: Optional[int]
+    make: Optional[str]
+    model: Optional[str]
+    search_text: str
+    fused_search_text: str
+    # Compiled once with the spec: every keyword present (None: no keywords)
+    # and a fullmatch for the years in range (None: no range)
+    keyword_re: Optional[re.Pattern]
+    year_re: Optional[re.Pattern]
+
+    @property
+    def has_year_range(self):
+        return self.ymin is not None and self.ymax is not None
+
+    def matches_text(self, text_lower):
+        """True when every keyword appears in already-lowercased text."""
+        return self.keyword_re is None or self.keyword_re.match(text_lower) is not None
+
+    def year_in_range(self, year):
+        """True when there is no year range or `year` falls inside it."""
+        if not self.has_year_range:
+            return True
+        return year is not None and self.ymin <= year <= self.ymax
+
+
+def prepare_filter_rows(rows):
+    """
+    (row, haystack, year text) per row, computed once per page so every
+    target filtering the same rows skips re-lowering and re-scanning them.
+    The year text is "" when the row has no year.
+    """
+    out = []
+    for row in rows:
+        year = extract_year_from_row(row)
+        out.append(
+            (
+                row,
+                (row.get("title", "") + " " + row.get("raw_text", "")).lower(),
+                "" if year is None else str(year),
+            )
+        )
+    return out
+
+
+QUERY_SPEC_CACHE_SIZE = 1024
+
+
+@st.cache_resource
+def _query_spec_cache():
+    # Process-wide, so specs outlive a rerun (which re-executes this script
+    # and would reset a module-level memo) and are shared by every session.
+    return {"lock": threading.Lock(), "specs": OrderedDict(), "hits": 0, "misses": 0}
+
+
+def compile_query(query: str) -> QuerySpec:
+    """
+    Memoized QuerySpec for a target string (see QuerySpec), kept in an LRU
+    of QUERY_SPEC_CACHE_SIZE entries that survives Streamlit reruns.
+    """
+    cache = _query_spec_cache()
+    with cache["lock"]:
+        spec = cache["specs"].get(query)
+        if spec is not None:
+            cache["specs"].move_to_end(query)
+            cache["hits"] += 1
+            return spec
+        cache["misses"] += 1
+
+    spec = _build_query_spec(query)
+    with cache["lock"]:
+        cache["specs"][query] = spec
+        while len(cache["specs"]) > QUERY_SPEC_CACHE_SIZE:
+            cache["specs"].popitem(last=False)
+    return spec
+
+
+def _keyword_pattern(keywords):
+    """
+    One lookahead per keyword: matches (at 0) text containing them all.
+    Greedy `.*` under DOTALL jumps to the end and scans back for the literal,
+    which beats both a lazy `.*?` and `all(k in text ...)` on result rows.
+    """
+    if not keywords:
+        return None
+    return re.compile("".join(f"(?=.*{re.escape(k)})" for k in keywords), re.S)
+
+
+def _year_pattern(ymin, ymax):
+    """Fullmatch for any year from ymin to ymax, or None without a range."""
+    if ymin is None or ymax is None:
+        return None
+    return re.compile("|".join(str(y) for y in range(ymin, ymax + 1)))
+
+
+def _build_query_spec(query):
+    ymin, ymax = parse_year_range(query)
+    make, model = parse_budget_make_model(query)
+    keywords = tuple(extract_keywords(query))
+    return QuerySpec(
+        query=query,
+        keywords=keywords,
+        ymin=ymin,
+        ymax=ymax,
+        make=make,
+        model=model,
+        search_text=clean_query_for_search(query),
+        # Engine variants dropped too, so close targets share one pyp search
+        fused_search_text=fused_search_text(query),
+        keyword_re=_keyword_pattern(keywords),
+        year_re=_year_pattern(ymin, ymax),
+    )
+
+
+def expand_variant_lines(lines):
+    """
+    Expand lines with the pattern:
+      '<base> : v1, v2, v3'
+    or:
+      '<base> : v1/v2/v3'
+    into:
+      '<base> v1'
+      '<base> v2'
+      '<base> v3'
     """
     expanded = []
     for line in lines:
@@ -748,6 +1999,257 @@ def expand_variant_lines(lines):
     return expanded
 
 
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a fixed set of keywords.
+
+    find_all(text) walks the text once and yields (start, keyword) for every
+    occurrence of every keyword, so matching cost grows with the text size
+    rather than text size × number of keywords.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = sorted(set(k for k in keywords if k))
+        goto = [{}]
+        out = [[]]
+        for kw in self.keywords:
+            node = 0
+            for ch in kw:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    goto.append({})
+                    out.append([])
+                    nxt = len(goto) - 1
+                    goto[node][ch] = nxt
+                node = nxt
+            out[node].append(kw)
+
+        # Breadth-first pass to build failure links and merge outputs
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in goto[node].items():
+                queue.append(nxt)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                cand = goto[f].get(ch, 0)
+                fail[nxt] = cand if cand != nxt else 0
+                out[nxt] = out[nxt] + out[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def find_all(self, text):
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for kw in out[node]:
+                yield i - len(kw) + 1, kw
+
+
+# Characters of context kept on each side of a VIN when checking keywords
+VIN_SNIPPET_RADIUS = 120
+
+
+def match_vins_to_targets(text, text_lower, targets):
+    """
+    Single pass over a text-style inventory page: assign each VIN to every
+    target whose keywords (compile_query) all appear within VIN_SNIPPET_RADIUS
+    characters of it (same rule as the old per-query snippet check).
+
+    Returns {target: [vin, ...]} with VINs in first-seen order.
+    """
+    kw_by_target = {t: compile_query(t).keywords for t in targets}
+    matcher = KeywordMatcher(k for kws in kw_by_target.values() for k in kws)
+
+    # Every keyword occurrence, already sorted by start offset
+    hits = list(matcher.find_all(text_lower))
+    hit_starts = [start for start, _ in hits]
+
+    out = {t: [] for t in targets}
+    seen = {t: set() for t in targets}
+    for m in VIN_PATTERN.finditer(text):
+        vin_txt = m.group(0)
+        # Random 17-character strings (part numbers, hashes) fail the check digit
+        if not vin_check_digit_ok(vin_txt):
+            continue
+        lo = max(0, m.start() - VIN_SNIPPET_RADIUS)
+        hi = min(len(text_lower), m.end() + VIN_SNIPPET_RADIUS)
+
+        # Keywords fully inside the snippet window
+        present = set()
+        for j in range(bisect_left(hit_starts, lo), bisect_left(hit_starts, hi)):
+            start, kw = hits[j]
+            if start + len(kw) <= hi:
+                present.add(kw)
+
+        for t, kws in kw_by_target.items():
+            if vin_txt in seen[t]:
+                continue
+            if kws and not all(k in present for k in kws):
+                continue
+            seen[t].add(vin_txt)
+            out[t].append(vin_txt)
+    return out
+
+
+# ==== eBay comps store ====
+
+EBAY_COMPS_DB_PATH = "ebay_comps.sqlite3"
+EBAY_COMPS_TTL = 86400  # sold comps are reused for 24h
+EBAY_COMPS_MAX_ENTRIES = 20000
+EBAY_COMPS_HOT_SIZE = 2000
+# Old whole-file JSON cache; imported once into the store if present
+EBAY_LEGACY_CACHE_FILE = "ebay_cache.json"
+
+
+class CompsStore(_SqliteStore):
+    """
+    eBay sold-comps cache: query -> {avg_price, count} with a per-key TTL.
+
+    Backed by a SQLite table in WAL mode (indexed O(1) lookups, atomic
+    single-row writes, safe across Streamlit sessions), fronted by a small
+    in-memory hot layer. Once the table grows past `max_entries`, the oldest
+    rows are evicted.
+    """
+
+    def __init__(
+        self,
+        path=EBAY_COMPS_DB_PATH,
+        max_entries=EBAY_COMPS_MAX_ENTRIES,
+        hot_size=EBAY_COMPS_HOT_SIZE,
+    ):
+        super().__init__(path)
+        self.max_entries = max_entries
+        self.hot_size = hot_size
+        self._hot = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        try:
+            with self._conn() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS comps ("
+                    "query TEXT PRIMARY KEY, avg_price REAL, count INTEGER NOT NULL, "
+                    "stored_at REAL NOT NULL, expires_at REAL NOT NULL)"
+                )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS comps_stored_at ON comps (stored_at)"
+                )
+            self._import_legacy_json(EBAY_LEGACY_CACHE_FILE)
+        except sqlite3.Error:
+            # Best effort; the hot layer still works without the disk store
+            pass
+
+    def _import_legacy_json(self, path):
+        if not os.path.exists(path):
+            return
+        conn = self._conn()
+        if conn.execute("SELECT 1 FROM comps LIMIT 1").fetchone():
+            return
+        try:
+            with open(path, "r") as f:
+                legacy = json.load(f)
+        except Exception:
+            return
+        # Old keys are raw queries; store them under the key lookups now use,
+        # keeping the newest entry when several collapse onto one key
+        rows = {}
+        for query, entry in (legacy or {}).items():
+            if not isinstance(entry, dict):
+                continue
+            key = canonical_ebay_query(query)
+            ts = float(entry.get("timestamp", 0) or 0)
+            if not key or (key in rows and rows[key][3] >= ts):
+                continue
+            rows[key] = (
+                key, entry.get("avg_price"), entry.get("count", 0), ts, ts + EBAY_COMPS_TTL
+            )
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO comps (query, avg_price, count, stored_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                list(rows.values()),
+            )
+
+    def _remember(self, query, entry):
+        with self._lock:
+            self._hot[query] = entry
+            self._hot.move_to_end(query)
+            while len(self._hot) > self.hot_size:
+                self._hot.popitem(last=False)
+
+    def get(self, query):
+        """Fresh stats for `query`, or None if missing/expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._hot.get(query)
+            if entry is not None:
+                if entry["expires_at"] > now:
+                    self._hot.move_to_end(query)
+                    return {"avg_price": entry["avg_price"], "count": entry["count"]}
+                del self._hot[query]
+        try:
+            row = (
+                self._conn()
+                .execute(
+                    "SELECT avg_price, count, expires_at FROM comps WHERE query = ?",
+                    (query,),
+                )
+                .fetchone()
+            )
+        except sqlite3.Error:
+            return None
+        if row is None or row[2] <= now:
+            return None
+        entry = {"avg_price": row[0], "count": row[1], "expires_at": row[2]}
+        self._remember(query, entry)
+        return {"avg_price": entry["avg_price"], "count": entry["count"]}
+
+    def put(self, query, avg_price, count, ttl=EBAY_COMPS_TTL):
+        now = time.time()
+        entry = {"avg_price": avg_price, "count": count, "expires_at": now + ttl}
+        self._remember(query, entry)
+        try:
+            with self._conn() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO comps "
+                    "(query, avg_price, count, stored_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (query, avg_price, count, now, now + ttl),
+                )
+        except sqlite3.Error:
+            return
+        with self._lock:
+            self._writes += 1
+            evict = self._writes % 100 == 0
+        if evict:
+            self.evict()
+
+    def evict(self):
+        """Drop expired rows, then the oldest rows beyond max_entries."""
+        try:
+            with self._conn() as conn:
+                conn.execute("DELETE FROM comps WHERE expires_at <= ?", (time.time(),))
+                conn.execute(
+                    "DELETE FROM comps WHERE query IN ("
+                    "SELECT query FROM comps ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+        except sqlite3.Error:
+            pass
+
+
+@st.cache_resource
+def get_comps_store():
+    return CompsStore()
+
+
 # ==== eBay Integration Helpers ====
 def build_ebay_query_from_row(row: dict) -> str:
     """
@@ -942,97 +2444,86 @@ def rewrite_airbag_query(raw_query: str) -> tuple[str, str]:
     return effective.strip(), note
 
 
+def canonical_ebay_query(query: str) -> str:
+    """eBay search is case/whitespace-insensitive; collapse queries that differ only there."""
+    return " ".join((query or "").lower().split())
+
+
 def fetch_ebay_sold_stats(query: str, max_items: int = 15) -> dict:
     """
-    Hybrid eBay sold stats with local file cache, robust scraping, and SerpAPI fallback.
+    Hybrid eBay sold stats with a local comps store, robust scraping, and SerpAPI fallback.
+    The query is canonicalized first, so every caller shares one store key
+    and one in-flight fetch per part.
     """
+    query = canonical_ebay_query(query)
     if not query:
         return {"avg_price": None, "count": 0}
 
-    # --- Retry tracker for eBay HTML failures ---
-    if "ebay_fail_count" not in st.session_state:
-        st.session_state["ebay_fail_count"] = {}
-    if query not in st.session_state["ebay_fail_count"]:
-        st.session_state["ebay_fail_count"][query] = 0
+    # Use cached comps if < 24h old (silent hit; just return the stored stats)
+    store = get_comps_store()
+    cached = store.get(query)
+    if cached is not None:
+        return cached
 
-    cache_file = "ebay_cache.json"
-    cache: dict = {}
-    now = datetime.now().timestamp()
+    # Concurrent lookups of the same query (any session) share one live fetch
+    return get_singleflight().do(
+        ("ebay", query), lambda: _fetch_ebay_sold_stats_live(query, max_items)
+    )
 
-    # Load cache (best effort)
-    try:
-        if os.path.exists(cache_file):
-            with open(cache_file, "r") as f:
-                cache = json.load(f)
-    except Exception:
-        cache = {}
-
-    # Use cache if data < 24h old
-    if query in cache:
-        entry = cache[query]
-        if now - entry.get("timestamp", 0) < 86400:
-            # Silent cache hit; just return the stored stats.
-            return {
-                "avg_price": entry.get("avg_price"),
-                "count": entry.get("count", 0),
-            }
+
+def _fetch_ebay_sold_stats_live(query: str, max_items: int) -> dict:
+    """The uncached eBay HTML -> SerpAPI lookup behind fetch_ebay_sold_stats."""
+    store = get_comps_store()
 
     prices: list[float] = []
 
     try:
         # --- Primary: quick HTML scrape of eBay sold/completed page ---
+        # While the "ebay-html" breaker is open (eBay is blocking us) this
+        # raises CircuitOpenError immediately and we go straight to SerpAPI.
         base_url = "https://www.ebay.com/sch/i.html"
         params = {"_nkw": query, "LH_Sold": "1", "LH_Complete": "1"}
-        headers = {"User-Agent": "Mozilla/5.0"}
 
         html_text = ""
         try:
-            r = requests.get(base_url, params=params, headers=headers, timeout=10)
+            r = http_get(base_url, params=params, timeout=10, breaker="ebay-html")
             if r.status_code == 200 and "captcha" not in r.text.lower():
                 html_text = r.text
         except Exception:
-            # HTML fetch failed; we'll fall back to API without extra chatter.
+            # HTML fetch failed or skipped; fall back to API without extra chatter.
             html_text = ""
 
-        # --- HTML failcount logic: if failed twice, we consider HTML unreliable ---
-        if not html_text:
-            st.session_state["ebay_fail_count"][query] += 1
-            if st.session_state["ebay_fail_count"][query] >= 2:
-                html_text = ""
-                # Second miss: treat HTML as dead and rely on API (no extra text).
-            else:
-                # First miss: allow next stage to decide if API is needed.
-                pass
-
-        # If we have HTML, try to scrape prices
+        # If we have HTML, try to scrape prices. Only the price nodes are
+        # parsed; the "$" text fallback reads the page without a DOM.
         if html_text:
-            soup = BeautifulSoup(html_text, "html.parser")
-
-            selectors = [
-                ".s-item__price",
-                ".x-price-approx__price",
-                "[itemprop='price']",
+            selector_passes = [
+                (EBAY_PRICE_CLASS_STRAINER, [".s-item__price", ".x-price-approx__price"]),
+                (EBAY_ITEMPROP_PRICE_STRAINER, ["[itemprop='price']"]),
             ]
-            for sel in selectors:
-                for price_el in soup.select(sel):
-                    txt = price_el.get_text(" ", strip=True)
-                    m = re.search(r"([\d,.]+)", txt)
-                    if not m:
-                        continue
-                    try:
-                        val = float(m.group(1).replace(",", ""))
-                    except Exception:
-                        continue
-                    if val > 0 and math.isfinite(val):
-                        prices.append(val)
-                        if len(prices) >= max_items:
-                            break
+            for strainer, selectors in selector_passes:
+                soup = make_soup(html_text, parse_only=strainer, label="ebay")
+                for sel in selectors:
+                    for price_el in soup.select(sel):
+                        txt = price_el.get_text(" ", strip=True)
+                        m = re.search(r"([\d,.]+)", txt)
+                        if not m:
+                            continue
+                        try:
+                            val = float(m.group(1).replace(",", ""))
+                        except Exception:
+                            continue
+                        if val > 0 and math.isfinite(val):
+                            prices.append(val)
+                            if len(prices) >= max_items:
+                                break
+                    if prices:
+                        break
                 if prices:
                     break
 
             # Fallback: scan whole page text for $price patterns
             if not prices:
-                text_block = soup.get_text(" ", strip=True)
+                text_block = html_to_text(html_text, label="ebay")
                 for m in re.finditer(r"\$([\d,.]+)", text_block):
                     try:
                         val = float(m.group(1).replace(",", ""))
@@ -1062,7 +2553,9 @@ def fetch_ebay_sold_stats(query: str, max_items: int = 15) -> dict:
                         "show_only": "Sold",
                         "_ipg": "50",
                     }
-                    serp_resp = requests.get(serp_url, params=serp_params, timeout=15)
+                    serp_resp = http_get(
+                        serp_url, params=serp_params, timeout=15, breaker="serpapi"
+                    )
                     if serp_resp.status_code == 200:
                         serp_data = serp_resp.json()
                         # SerpAPI eBay engine returns results in 'organic_results'
@@ -1091,6 +2584,9 @@ def fetch_ebay_sold_stats(query: str, max_items: int = 15) -> dict:
                         st.warning(
                             f"SerpAPI HTTP {serp_resp.status_code} for query '{query}'."
                         )
+            except CircuitOpenError:
+                # SerpAPI is failing too; don't warn on every row while it's open.
+                pass
             except Exception as e:
                 st.warning(f"SerpAPI fallback error: {e}")
 
@@ -1100,17 +2596,8 @@ def fetch_ebay_sold_stats(query: str, max_items: int = 15) -> dict:
             result = {"avg_price": avg_price, "count": len(prices)}
             st.info(f"eBay sold stats: {len(prices)} items, avg ${avg_price:.2f}")
 
-            # Update cache
-            cache[query] = {
-                "avg_price": avg_price,
-                "count": len(prices),
-                "timestamp": now,
-            }
-            try:
-                with open(cache_file, "w") as f:
-                    json.dump(cache, f)
-            except Exception as e:
-                st.warning(f"eBay cache write error: {e}")
+            # Update cache (single-row atomic write)
+            store.put(query, avg_price, len(prices))
 
             return result
 
@@ -1126,56 +2613,281 @@ def fetch_ebay_sold_stats(query: str, max_items: int = 15) -> dict:
 # SCRAPER CORE
 ############################################################
 
+# On-disk HTTP cache for yard inventory pages: each body with its validators
+# (ETag / Last-Modified) and a content hash, plus the rows parsed from that
+# body, so rescanning an unchanged yard costs a 304 or a hash comparison.
+YARD_HTTP_CACHE_PATH = "yard_http_cache.sqlite3"
+YARD_HTTP_CACHE_MAX_AGE = 7 * 86400  # drop pages not seen for a week
+# Bump when a scraper's parsing/filtering changes so stored parses are ignored
+YARD_PARSE_VERSION = 3
+
+
+class YardPageCache(_SqliteStore):
+    """url -> last body + validators; (parse key, body hash) -> parsed rows."""
+
+    def __init__(self, path=YARD_HTTP_CACHE_PATH):
+        super().__init__(path)
+        self.stats = {"not_modified": 0, "unchanged": 0, "changed": 0, "parse_hits": 0}
+        self._lock = threading.Lock()
+        try:
+            with self._conn() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS pages ("
+                    "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+                    "body_hash TEXT NOT NULL, body TEXT NOT NULL, fetched_at REAL NOT NULL)"
+                )
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS parsed ("
+                    "key TEXT PRIMARY KEY, body_hash TEXT NOT NULL, "
+                    "rows TEXT NOT NULL, stored_at REAL NOT NULL)"
+                )
+                cutoff = time.time() - YARD_HTTP_CACHE_MAX_AGE
+                conn.execute("DELETE FROM pages WHERE fetched_at < ?", (cutoff,))
+                conn.execute("DELETE FROM parsed WHERE stored_at < ?", (cutoff,))
+        except sqlite3.Error:
+            pass
+
+    def count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
 
-def scan_central_pickandpay(yard_name, query, want_drive):
+    def stats_snapshot(self):
+        with self._lock:
+            return dict(self.stats)
+
+    def get_page(self, url):
+        try:
+            row = (
+                self._conn()
+                .execute(
+                    "SELECT etag, last_modified, body_hash, body FROM pages WHERE url = ?",
+                    (url,),
+                )
+                .fetchone()
+            )
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        return {"etag": row[0], "last_modified": row[1], "body_hash": row[2], "body": row[3]}
+
+    def put_page(self, url, etag, last_modified, body_hash, body):
+        try:
+            with self._conn() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO pages "
+                    "(url, etag, last_modified, body_hash, body, fetched_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (url, etag, last_modified, body_hash, body, time.time()),
+                )
+        except sqlite3.Error:
+            pass
+
+    def touch_page(self, url):
+        try:
+            with self._conn() as conn:
+                conn.execute(
+                    "UPDATE pages SET fetched_at = ? WHERE url = ?", (time.time(), url)
+                )
+        except sqlite3.Error:
+            pass
+
+    def get_parsed(self, key, body_hash):
+        try:
+            row = (
+                self._conn()
+                .execute(
+                    "SELECT rows FROM parsed WHERE key = ? AND body_hash = ?",
+                    (key, body_hash),
+                )
+                .fetchone()
+            )
+        except sqlite3.Error:
+            return None
+        return json.loads(row[0]) if row else None
+
+    def put_parsed(self, key, body_hash, rows):
+        try:
+            with self._conn() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO parsed (key, body_hash, rows, stored_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, body_hash, json.dumps(rows), time.time()),
+                )
+        except sqlite3.Error:
+            pass
+
+
+@st.cache_resource
+def get_yard_page_cache():
+    return YardPageCache()
+
+
+def fetch_yard_page(url, breaker=None):
+    """
+    Conditional GET for a yard page. Returns (text, body_hash); body_hash is
+    None for non-200 responses (nothing is cached for those). A 304 returns
+    the stored body and hash, so callers can reuse their previous parse.
+    """
+    cache = get_yard_page_cache()
+    cached = cache.get_page(url)
+    headers = {}
+    if cached and cached["etag"]:
+        headers["If-None-Match"] = cached["etag"]
+    if cached and cached["last_modified"]:
+        headers["If-Modified-Since"] = cached["last_modified"]
+
+    r = http_get(url, breaker=breaker, **({"headers": headers} if headers else {}))
+    if r.status_code == 304 and cached:
+        cache.count("not_modified")
+        cache.touch_page(url)
+        return cached["body"], cached["body_hash"]
+    if r.status_code != 200:
+        return r.text, None
+
+    body_hash = hashlib.sha256(r.content).hexdigest()
+    cache.count("unchanged" if cached and cached["body_hash"] == body_hash else "changed")
+    cache.put_page(
+        url, r.headers.get("ETag"), r.headers.get("Last-Modified"), body_hash, r.text
+    )
+    return r.text, body_hash
+
+
+def cached_parse(key, body_hash, parse):
+    """
+    parse() for this page body, or the JSON-able result stored the last time
+    the same body (by hash) was parsed under `key`.
+    """
+    if body_hash is None:
+        return parse()
+    cache = get_yard_page_cache()
+    result = cache.get_parsed(key, body_hash)
+    if result is not None:
+        cache.count("parse_hits")
+        return result
+    result = parse()
+    cache.put_parsed(key, body_hash, result)
+    return result
+
+
+
+# Central Florida Pick & Pay publishes its whole inventory on one page that
+# doesn't depend on the query, so every target shares one fetched snapshot.
+CFPP_INVENTORY_URL = "https://centralfloridapickandpay.com/vehicle-inventory/"
+CFPP_SNAPSHOT_TTL = int(os.environ.get("CFPP_SNAPSHOT_TTL", "600"))  # seconds
+
+
+@st.cache_resource
+def _cfpp_snapshot_holder():
+    return {"lock": threading.Lock(), "snapshot": None}
+
+
+def get_cfpp_snapshot(max_age=None):
+    """
+    Fetch and parse the CFPP inventory page at most once per freshness window
+    (CFPP_SNAPSHOT_TTL seconds by default). Concurrent callers wait on the
+    same fetch instead of each downloading the page.
+
+    Returns a dict: text, text_lower, date_found, fetched_at, body_hash.
+    """
+    if max_age is None:
+        max_age = CFPP_SNAPSHOT_TTL
+
+    holder = _cfpp_snapshot_holder()
+    with holder["lock"]:
+        snap = holder["snapshot"]
+        if snap is not None and time.time() - snap["fetched_at"] < max_age:
+            return snap
+
+        page, body_hash = fetch_yard_page(
+            CFPP_INVENTORY_URL, breaker="yard:centralfloridapickandpay"
+        )
+        # Non-200 (no body hash): never cache an error page as the inventory
+        if body_hash is None:
+            raise requests.RequestException(
+                f"{CFPP_INVENTORY_URL} returned an error page; not cached"
+            )
+
+        # Same page as the last snapshot: keep its text and target matches
+        if snap is not None and body_hash and body_hash == snap.get("body_hash"):
+            snap["fetched_at"] = time.time()
+            return snap
+
+        # Get all visible text (no DOM needed; VIN windows are cut from this)
+        text = html_to_text(page, label="cfpp")
+        snap = {
+            "text": text,
+            "text_lower": text.lower(),
+            "date_found": normalize_date(text),
+            "fetched_at": time.time(),
+            "body_hash": body_hash,
+            # target-set -> {query: [vin, ...]}, filled by cfpp_target_matches
+            "matches": {},
+            "match_lock": threading.Lock(),
+        }
+        holder["snapshot"] = snap
+        return snap
+
+
+def cfpp_target_matches(snap, targets):
+    """
+    Keyword/VIN matches for a set of targets against one CFPP snapshot,
+    computed once per (snapshot, target set) no matter how many jobs ask.
+    """
+    key = tuple(sorted(set(targets)))
+    with snap["match_lock"]:
+        if key not in snap["matches"]:
+            snap["matches"][key] = match_vins_to_targets(
+                snap["text"], snap["text_lower"], key
+            )
+        return snap["matches"][key]
+
+
+def scan_central_pickandpay(yard_name, query, want_drive, targets=None):
     """
     Scrape Central Florida Pick & Pay vehicle inventory:
     https://centralfloridapickandpay.com/vehicle-inventory/
 
     We:
-      - Pull full page text
+      - Pull full page text (shared snapshot, see get_cfpp_snapshot)
       - Find all VINs
       - Look at a small snippet of text around each VIN
       - Keep only VINs whose nearby text matches the query keywords (e.g. "honda", "accord")
       - VIN-decode only those candidates and filter by year range
+
+    `targets` is every active query in this scan; the keyword sweep is done
+    once for all of them and cached on the snapshot.
     """
-    url = "https://centralfloridapickandpay.com/vehicle-inventory/"
+    url = CFPP_INVENTORY_URL
 
     try:
-        r = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=20)
-        soup = BeautifulSoup(r.text, "html.parser")
-
-        # Get all visible text
-        text = soup.get_text("\n", strip=True)
-        text_lower = text.lower()
+        snap = get_cfpp_snapshot()
+        text = snap["text"]
+        text_lower = snap["text_lower"]
 
         rows_out = []
-        ymin, ymax = parse_year_range(query)
-        kw = extract_keywords(query)
-        cf_make, cf_model = parse_budget_make_model(query)
-
-        candidate_vins = set()
-
-        # First pass — scan around each VIN and see if nearby text matches our keywords
-        for m in VIN_PATTERN.finditer(text):
-            vin_txt = m.group(0)
-            start = max(0, m.start() - 120)
-            end = min(len(text_lower), m.end() + 120)
-            snippet = text_lower[start:end]
+        spec = compile_query(query)
+        cf_make, cf_model = spec.make, spec.model
 
-            # Must contain all query keywords (e.g. "honda", "accord")
-            if kw and not all(k in snippet for k in kw):
-                continue
-
-            candidate_vins.add(vin_txt)
+        # First pass — one shared sweep assigns each VIN to every target whose
+        # keywords (e.g. "honda", "accord") appear in the text around it
+        candidate_vins = cfpp_target_matches(snap, targets or [query]).get(query, [])
 
         # st.write(
         #   f"CFPP DEBUG: narrowed to {len(candidate_vins)} candidate VINs after snippet filter"
         # )
 
-        # Second pass — VIN-decode only filtered candidate VINs
+        # Drop VINs whose own year/make digits already rule them out
+        candidate_vins = [
+            v
+            for v in candidate_vins
+            if not vin_fails_prefilter(v, spec.ymin, spec.ymax, cf_make)
+        ]
+
+        # Second pass — VIN-decode only filtered candidate VINs (one batch)
+        vin_infos = decode_vins_batch(candidate_vins)
         for vin_txt in candidate_vins:
-            vin_info = decode_vin_nhtsa(vin_txt)
+            vin_info = vin_infos[vin_txt]
             year_dec = vin_info["year"]
             make_dec = (vin_info["make"] or "").lower()
             model_dec = (vin_info["model"] or "").lower()
@@ -1191,14 +2903,12 @@ def scan_central_pickandpay(yard_name, query, want_drive):
 
             # Additional safety: decoded make/model label must still roughly match all keywords
             label = f"{make_dec} {model_dec}".strip()
-            if kw and not all(k in label for k in kw):
+            if not spec.matches_text(label):
                 continue
 
             # Year range check (use decoded year)
-            y_final = year_dec
-            if ymin is not None and ymax is not None:
-                if y_final is None or not (ymin <= y_final <= ymax):
-                    continue
+            if not spec.year_in_range(year_dec):
+                continue
 
             title = f"{year_dec or ''} {vin_info['make'] or ''} {vin_info['model'] or ''}".strip()
 
@@ -1209,7 +2919,7 @@ def scan_central_pickandpay(yard_name, query, want_drive):
                     "query": query,
                     "title": title,
                     "link": url,
-                    "date_found": normalize_date(text),
+                    "date_found": snap["date_found"],
                     "drivetrain": vin_info.get("drive", "") or "",
                     "raw_text": vin_txt,
                     "stock": "",
@@ -1230,268 +2940,743 @@ def scan_central_pickandpay(yard_name, query, want_drive):
         return []
 
 
-def scan_budget_upullit(yard_name, query, want_drive):
+def budget_inventory_url(query):
+    """Budget U Pull It inventory URL for a target's make/model, or None."""
+    spec = compile_query(query)
+    if not spec.make or not spec.model:
+        return None
+    return (
+        "https://budgetupullit.com/current-inventory/"
+        f"?make={spec.make}&model={spec.model}"
+    )
+
+
+def _budget_page(url):
+    """VINs and best-effort date from one Budget inventory page."""
+    text, body_hash = fetch_yard_page(url, breaker="yard:budgetupullit")
+
+    def _parse():
+        # Get all visible text and extract VINs page-wide (no DOM needed)
+        page_text = html_to_text(text, label="budgetupullit")
+        return {
+            "vins": VIN_PATTERN.findall(page_text),
+            "date_found": normalize_date(page_text),
+        }
+
+    # An unchanged page reuses the VIN list from last time
+    return cached_parse(f"budgetupullit|{YARD_PARSE_VERSION}|{url}", body_hash, _parse)
+
+
+def scan_budget_upullit_batch(yard_name, queries, want_drive):
     """
     Scrape Budget U Pull It current inventory:
     https://budgetupullit.com/current-inventory/?make=...&model=...
 
     The page is plain text, not real <tr>/<td> rows, so we parse lines.
+    Targets with the same make/model share one page fetch and one batched
+    decode; each target's year range is applied locally. Returns {query: rows}.
     """
-    make, model = parse_budget_make_model(query)
-    if not make or not model:
-        st.warning(f"{yard_name}: could not parse make/model from query '{query}'.")
-        return []
+    out = {q: [] for q in queries}
+    groups = OrderedDict()
+    for q in queries:
+        spec = compile_query(q)
+        if not spec.make or not spec.model:
+            st.warning(f"{yard_name}: could not parse make/model from query '{q}'.")
+            continue
+        groups.setdefault((spec.make, spec.model), []).append(q)
+
+    for (make, model), qs in groups.items():
+        url = budget_inventory_url(qs[0])
+        try:
+            page = _budget_page(url)
+            specs = {q: compile_query(q) for q in qs}
+
+            # Offline check digit / model year / WMI make filter before NHTSA;
+            # a VIN is decoded if any target in the group could use it.
+            unique_vins = [
+                v
+                for v in dict.fromkeys(page["vins"])
+                if any(
+                    not vin_fails_prefilter(v, spec.ymin, spec.ymax, make)
+                    for spec in specs.values()
+                )
+            ]
+            vin_infos = decode_vins_batch(unique_vins)
 
-    url = f"https://budgetupullit.com/current-inventory/?make={make}&model={model}"
+            for query in qs:
+                spec = specs[query]
+                rows_out = []
+                for vin_txt in unique_vins:
+                    if vin_fails_prefilter(vin_txt, spec.ymin, spec.ymax, make):
+                        continue
+                    vin_info = vin_infos[vin_txt]
+                    year_dec = vin_info["year"]
+                    make_dec = (vin_info["make"] or "").upper()
+                    model_dec = (vin_info["model"] or "").upper()
 
-    try:
-        r = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=20)
-        soup = BeautifulSoup(r.text, "html.parser")
+                    # basic sanity: decoded make/model should roughly match requested
+                    if make and make_dec and make not in make_dec:
+                        continue
+                    if model and model_dec and model not in model_dec.replace(" ", ""):
+                        continue
 
-        # Get all visible text and extract VINs page-wide
-        text = soup.get_text("\n", strip=True)
-        vin_list = VIN_PATTERN.findall(text)
+                    if not spec.year_in_range(year_dec):
+                        continue
 
-        rows_out = []
-        ymin, ymax = parse_year_range(query)
+                    title = f"{year_dec or ''} {vin_info['make'] or ''} {vin_info['model'] or ''}".strip()
 
-        for vin_txt in set(vin_list):
-            vin_info = decode_vin_nhtsa(vin_txt)
-            year_dec = vin_info["year"]
-            make_dec = (vin_info["make"] or "").upper()
-            model_dec = (vin_info["model"] or "").upper()
+                    rows_out.append(
+                        {
+                            "yard": yard_name,
+                            "slug": "budgetupullit",
+                            "query": query,
+                            "title": title,
+                            "link": url,
+                            "date_found": page["date_found"],  # best-effort
+                            "drivetrain": vin_info.get("drive", "") or "",
+                            "raw_text": vin_txt,
+                            "stock": "",
+                            "row": "",
+                            "vin": vin_txt,
+                            "yard_label": yard_name,
+                            "dec_year": year_dec,
+                            "dec_make": vin_info["make"],
+                            "dec_model": vin_info["model"],
+                            "dec_engine": vin_info["engine"],
+                        }
+                    )
+                out[query] = rows_out
 
-            # basic sanity: decoded make/model should roughly match requested
-            if make and make_dec and make not in make_dec:
-                continue
-            if model and model_dec and model not in model_dec.replace(" ", ""):
-                continue
+        except Exception as e:
+            st.error(f"{yard_name} (Budget U Pull It) error: {e}")
 
-            y_final = year_dec
-            if ymin is not None and ymax is not None:
-                if y_final is None or not (ymin <= y_final <= ymax):
-                    continue
+    return out
 
-            title = f"{year_dec or ''} {vin_info['make'] or ''} {vin_info['model'] or ''}".strip()
 
-            rows_out.append(
-                {
-                    "yard": yard_name,
-                    "slug": "budgetupullit",
-                    "query": query,
-                    "title": title,
-                    "link": url,
-                    "date_found": normalize_date(text),  # best-effort
-                    "drivetrain": vin_info.get("drive", "") or "",
-                    "raw_text": vin_txt,
-                    "stock": "",
-                    "row": "",
-                    "vin": vin_txt,
-                    "yard_label": yard_name,
-                    "dec_year": year_dec,
-                    "dec_make": vin_info["make"],
-                    "dec_model": vin_info["model"],
-                    "dec_engine": vin_info["engine"],
-                }
-            )
+def scan_budget_upullit(yard_name, query, want_drive):
+    """Single-query form of scan_budget_upullit_batch."""
+    return scan_budget_upullit_batch(yard_name, [query], want_drive)[query]
+
 
+# --- Budget U Pull It S3 Location scraper ---
+S3_INVENTORY_URL = "http://budgetupullit.s3softwaresolutions.com/inventory.aspx"
+
+
+class S3BudgetSession:
+    """
+    One browser-like session against the S3 Software Solutions inventory
+    form: its own cookie jar, plus the ASP.NET hidden fields (__VIEWSTATE,
+    __EVENTVALIDATION, ...) carried from each response into the next
+    postback, so a scan costs one GET and then one POST per make/model.
+    """
+
+    def __init__(self, base_url=S3_INVENTORY_URL):
+        self.base_url = base_url
+        self.session = requests.Session()
+        self.session.headers.update(get_http_session().headers)
+        self.form = {}
+        self.requests_made = 0
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _capture_form(self, html_text):
+        soup = make_soup(html_text, parse_only=S3_FORM_STRAINER, label="budget-s3 (form)")
+        form = {}
+        for inp in soup.find_all("input", type="hidden"):
+            if inp.get("name"):
+                form[inp["name"]] = inp.get("value", "")
+        if form:
+            self.form = form
+
+    def _load_form(self):
+        self.requests_made += 1
+        r = http_get(self.base_url, breaker="yard:budget-s3", session=self.session)
+        self._capture_form(r.text)
+
+    def _postback(self, make, model):
+        # POST exactly like the browser does, but with our make/model
+        payload = dict(self.form)
+        payload.update(
+            {
+                "__EVENTTARGET": "ddlModel",
+                "__EVENTARGUMENT": "",
+                "__LASTFOCUS": "",
+                "ddlMake": make,
+                "ddlModel": model,
+            }
+        )
+        self.requests_made += 1
+        return http_post(
+            self.base_url,
+            data=payload,
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            breaker="yard:budget-s3",
+            session=self.session,
+        )
+
+    def search(self, make, model):
+        """Inventory page HTML for one make/model postback."""
+        if not self.form:
+            try:
+                self._load_form()
+            except Exception:
+                # If we can't fetch hidden fields, we'll still try with empty ones
+                pass
+        r = self._postback(make, model)
+        if r.status_code != 200 and self.form:
+            # Stale/rejected view state: start over from a fresh form once
+            self.form = {}
+            self._load_form()
+            r = self._postback(make, model)
+        self._capture_form(r.text)
+        return r.text
+
+
+def _find_s3_inventory_table(soup):
+    """Innermost table whose text has the Year / Make / Model headers."""
+    for table in soup.find_all("table"):
+        if table.find("table") is not None:
+            continue
+        header_text = table.get_text(" ", strip=True).lower()
+        if "year" in header_text and "make" in header_text and "model" in header_text:
+            return table
+    return None
+
+
+def parse_s3_inventory(html_text, yard_name, query, base_url=S3_INVENTORY_URL):
+    """Rows for `query` from the inventory table of one S3 results page."""
+    rows_out = []
+    spec = compile_query(query)
+
+    soup = make_soup(html_text, parse_only=S3_TABLE_STRAINER, label="budget-s3")
+
+    # Only the inventory table (Year / Make / Model / Row / Arrival Date);
+    # layout tables wrapping it would repeat its rows.
+    table = _find_s3_inventory_table(soup)
+    if table is None:
         return rows_out
 
-    except Exception as e:
-        st.error(f"{yard_name} (Budget U Pull It) error: {e}")
-        return []
+    for tr in table.find_all("tr"):
+        tds = tr.find_all("td")
+        if len(tds) < 3:
+            continue
+
+        cells = [td.get_text(" ", strip=True) for td in tds]
+        line = " ".join(cells)
+        low = line.lower()
+
+        # Keyword filter (make/model words like "honda", "accord")
+        if not spec.matches_text(low):
+            continue
+
+        # Try to extract a year from the first cell or anywhere in the line
+        year_val = None
+        ym = YEAR_RE.search(cells[0]) if cells else None
+        if ym is None:
+            ym = YEAR_RE.search(line)
+        if ym:
+            year_val = int(ym.group(1))
+
+        # Only enforce year range if we actually found a 4-digit year
+        if year_val is not None and not spec.year_in_range(year_val):
+            continue
+
+        # Basic title: Year + Make + Model from first 3 columns
+        title = " ".join(cells[:3]).strip()
+        if not title:
+            title = line[:80]
+
+        # Attempt to detect drivetrain string from row text
+        drive = detect_drive(line)
+
+        # Arrival Date is typically the last column
+        date_found = ""
+        if cells:
+            for c in reversed(cells):
+                date_found = normalize_date(c)
+                if date_found:
+                    break
+
+        rows_out.append(
+            {
+                "yard": yard_name,
+                "slug": "budget-s3",
+                "query": query,
+                "title": title,
+                "link": base_url,
+                "date_found": date_found,
+                "drivetrain": drive,
+                "raw_text": line,
+                "stock": "",
+                "row": "",
+                "vin": None,
+                "yard_label": yard_name,
+                "dec_year": year_val,
+                "dec_make": None,
+                "dec_model": None,
+                "dec_engine": None,
+            }
+        )
+
+    return rows_out
+
+
+def scan_budget_s3_batch(yard_name, queries, want_drive):
+    """
+    Scrape Budget U Pull It second location (S3 Software Solutions inventory):
+    http://budgetupullit.s3softwaresolutions.com/inventory.aspx
+
+    This site appears to only show inventory AFTER a Make/Model search, so we
+    replay that form postback. All queries share one S3BudgetSession, and
+    queries with the same make/model share one postback.
+
+    Returns {query: rows}.
+    """
+    out = {q: [] for q in queries}
+    pages = {}  # (make, model) -> html
+    with S3BudgetSession() as s3:
+        for query in queries:
+            # Try to parse MAKE/MODEL from the user's query (reusing Budget helper)
+            spec = compile_query(query)
+            make, model = spec.make, spec.model
+            if not make or not model:
+                st.warning(f"{yard_name}: could not parse make/model from query '{query}'.")
+                continue
+            try:
+                if (make, model) not in pages:
+                    pages[(make, model)] = s3.search(make, model)
+                out[query] = parse_s3_inventory(
+                    pages[(make, model)], yard_name, query, s3.base_url
+                )
+            except Exception as e:
+                st.error(f"{yard_name} (Budget U Pull It S3) error: {e}")
+    return out
+
+
+def scan_budget_s3(yard_name, query, want_drive):
+    """Single-query form of scan_budget_s3_batch."""
+    return scan_budget_s3_batch(yard_name, [query], want_drive)[query]
+
+
+# --- U-Pull-&-Pay Orlando scraper ---
+# The inventory is a client-side JS app, so a headless browser loads the page
+# and we read the inventory JSON it fetches (not the rendered DOM).
+# The URL may use {make}, {model} and {query}; without placeholders one
+# capture is shared by every target.
+# The default is a best guess at the public search page and has not been
+# checked against the live site; set UPULL_ORLANDO_URL to the page that
+# actually loads the Orlando inventory JSON ({make}/{model}/{query} are
+# filled in, or leave them out for a full-inventory page).
+# Until then the scraper stays off: UPULL_ORLANDO_ENABLED=1 turns it on.
+UPULL_ORLANDO_ENABLED = os.environ.get("UPULL_ORLANDO_ENABLED", "").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+UPULL_ORLANDO_URL = os.environ.get(
+    "UPULL_ORLANDO_URL",
+    "https://upullandpay.com/inventory/?location=orlando&make={make}&model={model}",
+)
+# Which JSON responses the page loads count as inventory data
+UPULL_INVENTORY_JSON_RE = re.compile(
+    os.environ.get("UPULL_INVENTORY_JSON_RE", r"inventory|vehicle|search"), re.I
+)
+UPULL_SNAPSHOT_TTL = int(os.environ.get("UPULL_SNAPSHOT_TTL", "600"))  # seconds
+
+BROWSER_POOL_WORKERS = 2
+BROWSER_CONTEXT_MAX_PAGES = 50  # recycle a context after this many pages
+BROWSER_PAGE_TIMEOUT_MS = 30000
+BROWSER_BLOCKED_RESOURCES = {"image", "font", "media"}
+BROWSER_BLOCKED_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "facebook.com",
+    "facebook.net",
+    "hotjar.com",
+    "clarity.ms",
+    "segment.io",
+    "bing.com",
+)
+
+
+class BrowserPool:
+    """
+    Warm headless-Chromium contexts for JS-only inventory pages.
+
+    Playwright's sync API is bound to the thread that started it, so each of
+    `workers` threads owns one browser and one long-lived context and serves
+    page captures from a shared queue. Contexts are kept across queries (warm
+    HTTP cache, cookies, service workers) and recycled every
+    BROWSER_CONTEXT_MAX_PAGES pages. Images, fonts, media and analytics
+    requests are aborted before they leave the browser.
+    """
+
+    def __init__(self, workers=BROWSER_POOL_WORKERS):
+        self.workers = workers
+        self._tasks = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self.stats = {"pages": 0, "contexts": 0, "blocked": 0}
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def stats_snapshot(self):
+        with self._lock:
+            return dict(self.stats)
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(
+                    target=self._worker, name=f"browser-pool-{i}", daemon=True
+                )
+                t.start()
+                self._threads.append(t)
+
+    def capture_json(self, url, url_pattern, timeout=120):
+        """
+        Load `url` in a pooled context and return the parsed JSON bodies of
+        the responses whose URL matches `url_pattern`.
+        """
+        self._ensure_started()
+        fut = Future()
+        self._tasks.put((url, url_pattern, fut))
+        return fut.result(timeout=timeout)
+
+    def close(self):
+        for _ in self._threads:
+            self._tasks.put(None)
+        for t in self._threads:
+            t.join(timeout=10)
+
+    def _route(self, route):
+        req = route.request
+        host = urlsplit(req.url).hostname or ""
+        if req.resource_type in BROWSER_BLOCKED_RESOURCES or host.endswith(
+            BROWSER_BLOCKED_HOSTS
+        ):
+            self._count("blocked")
+            route.abort()
+        else:
+            route.continue_()
+
+    def _new_context(self, browser):
+        ctx = browser.new_context(user_agent=HTTP_USER_AGENT)
+        ctx.route("**/*", self._route)
+        self._count("contexts")
+        return ctx
+
+    def _capture(self, ctx, url, url_pattern):
+        page = ctx.new_page()
+        captured = []
+
+        def _on_response(resp):
+            ctype = resp.headers.get("content-type") or ""
+            if "json" in ctype and url_pattern.search(resp.url):
+                captured.append(resp)
+
+        page.on("response", _on_response)
+        try:
+            page.goto(url, wait_until="networkidle", timeout=BROWSER_PAGE_TIMEOUT_MS)
+            bodies = []
+            for resp in captured:
+                try:
+                    bodies.append(resp.json())
+                except Exception:
+                    continue
+            self._count("pages")
+            return bodies
+        finally:
+            page.close()
+
+    def _worker(self):
+        try:
+            pw = sync_playwright().start()
+            browser = pw.chromium.launch(headless=True)
+        except Exception as e:
+            # e.g. `playwright install chromium` was never run: fail fast
+            err = RuntimeError(f"headless browser unavailable: {e}")
+            while True:
+                task = self._tasks.get()
+                if task is None:
+                    return
+                task[2].set_exception(err)
+
+        ctx = self._new_context(browser)
+        pages = 0
+        try:
+            while True:
+                task = self._tasks.get()
+                if task is None:
+                    return
+                url, url_pattern, fut = task
+                if not fut.set_running_or_notify_cancel():
+                    continue
+                try:
+                    if pages >= BROWSER_CONTEXT_MAX_PAGES:
+                        ctx.close()
+                        ctx = self._new_context(browser)
+                        pages = 0
+                    pages += 1
+                    fut.set_result(self._capture(ctx, url, url_pattern))
+                except Exception as e:
+                    fut.set_exception(e)
+        finally:
+            try:
+                ctx.close()
+                browser.close()
+                pw.stop()
+            except Exception:
+                pass
+
 
+@st.cache_resource
+def get_browser_pool():
+    pool = BrowserPool()
+    atexit.register(pool.close)
+    return pool
 
-# --- Budget U Pull It S3 Location scraper ---
-def scan_budget_s3(yard_name, query, want_drive):
-    """
-    Scrape Budget U Pull It second location (S3 Software Solutions inventory):
-    http://budgetupullit.s3softwaresolutions.com/inventory.aspx
 
-    This site appears to only show inventory AFTER a Make/Model search,
-    so we try to simulate that by calling inventory.aspx with Make/Model
-    query parameters derived from the search string.
-    """
-    base_url = "http://budgetupullit.s3softwaresolutions.com/inventory.aspx"
+# Key aliases seen in inventory APIs (compared lower-case, without _ or spaces)
+_INVENTORY_FIELD_ALIASES = {
+    "vin": ("vin", "vinnumber", "vehiclevin"),
+    "year": ("year", "modelyear", "vehicleyear", "yr"),
+    "make": ("make", "makename", "vehiclemake", "manufacturer"),
+    "model": ("model", "modelname", "vehiclemodel"),
+    "row": ("row", "rownumber", "yardrow", "rowlocation"),
+    "stock": ("stock", "stocknumber", "stockno", "stockid"),
+    "date": ("arrivaldate", "dateadded", "setdate", "yarddate", "datein", "date"),
+}
 
-    # Try to parse MAKE/MODEL from the user's query (reusing Budget helper)
-    make, model = parse_budget_make_model(query)
-    if not make or not model:
-        st.warning(f"{yard_name}: could not parse make/model from query '{query}'.")
-        return []
 
-    try:
-        rows_out = []
-        ymin, ymax = parse_year_range(query)
-        kw = extract_keywords(query)
+def _inventory_field(node, field):
+    keys = {re.sub(r"[\s_]+", "", str(k)).lower(): v for k, v in node.items()}
+    for name in _INVENTORY_FIELD_ALIASES[field]:
+        val = keys.get(name)
+        if isinstance(val, dict):
+            val = val.get("name") or val.get("Name") or val.get("value")
+        if val not in (None, "") and not isinstance(val, (dict, list)):
+            return str(val).strip()
+    return None
 
-        # Step 1: initial GET to grab dynamic ASP.NET hidden fields
-        try:
-            r_init = requests.get(
-                base_url,
-                headers={"User-Agent": "Mozilla/5.0"},
-                timeout=20,
-            )
-            soup_init = BeautifulSoup(r_init.text, "html.parser")
 
-            def get_hidden(name):
-                inp = soup_init.find("input", {"name": name})
-                return inp.get("value", "") if inp else ""
+def iter_inventory_vehicles(data):
+    """
+    Vehicle records anywhere in a JSON document, whatever the nesting or key
+    casing: any object with a valid VIN, or with year + make + model.
+    Yields dicts: vin, year, make, model, row, stock, date.
+    """
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+            continue
+        if not isinstance(node, dict):
+            continue
+        rec = {f: _inventory_field(node, f) for f in _INVENTORY_FIELD_ALIASES}
+        vin = (rec["vin"] or "").upper()
+        rec["vin"] = vin if vin_check_digit_ok(vin) else None
+        if rec["vin"] or (rec["year"] and rec["make"] and rec["model"]):
+            yield rec
+            continue
+        stack.extend(reversed(list(node.values())))
 
-            viewstate = get_hidden("__VIEWSTATE")
-            viewstate_gen = get_hidden("__VIEWSTATEGENERATOR")
-            event_validation = get_hidden("__EVENTVALIDATION")
 
-        except Exception:
-            # If we can't fetch hidden fields, we'll still try with empty ones
-            viewstate = ""
-            viewstate_gen = ""
-            event_validation = ""
-
-        # Step 2: POST exactly like the browser does, but with our make/model
-        payload = {
-            "__EVENTTARGET": "ddlModel",
-            "__EVENTARGUMENT": "",
-            "__LASTFOCUS": "",
-            "__VIEWSTATE": viewstate,
-            "__VIEWSTATEGENERATOR": viewstate_gen,
-            "__EVENTVALIDATION": event_validation,
-            "ddlMake": make,
-            "ddlModel": model,
-        }
+@st.cache_resource
+def _upull_snapshot_holder():
+    return {"lock": threading.Lock(), "snapshots": {}}
 
-        r = requests.post(
-            base_url,
-            data=payload,
-            headers={
-                "User-Agent": "Mozilla/5.0",
-                "Content-Type": "application/x-www-form-urlencoded",
-            },
-            timeout=20,
-        )
 
-        soup = BeautifulSoup(r.text, "html.parser")
+def fetch_upull_inventory(url, max_age=None):
+    """
+    Vehicles from the inventory JSON the U-Pull-&-Pay page loads at `url`,
+    captured in the shared browser pool at most once per UPULL_SNAPSHOT_TTL.
+    Concurrent callers for the same URL share one capture.
+    """
+    if max_age is None:
+        max_age = UPULL_SNAPSHOT_TTL
+    holder = _upull_snapshot_holder()
+    with holder["lock"]:
+        snap = holder["snapshots"].get(url)
+    if snap is not None and time.time() - snap["fetched_at"] < max_age:
+        return snap["vehicles"]
+
+    def _capture():
+        cb = get_breaker("yard:upullandpay-orlando")
+        if not cb.allow():
+            raise CircuitOpenError(
+                f"yard:upullandpay-orlando circuit open; skipping {url}"
+            )
+        get_rate_limiter().acquire(urlsplit(url).hostname or "")
+        try:
+            bodies = get_browser_pool().capture_json(url, UPULL_INVENTORY_JSON_RE)
+        except Exception:
+            cb.record_failure()
+            raise
+        cb.record_success()
+
+        vehicles, seen = [], set()
+        for body in bodies:
+            for rec in iter_inventory_vehicles(body):
+                key = rec["vin"] or rec["stock"] or (
+                    rec["year"],
+                    rec["make"],
+                    rec["model"],
+                    rec["row"],
+                )
+                if key not in seen:
+                    seen.add(key)
+                    vehicles.append(rec)
+        with holder["lock"]:
+            holder["snapshots"][url] = {
+                "vehicles": vehicles,
+                "fetched_at": time.time(),
+            }
+        return vehicles
 
-        # Find the main results table – it should contain the Year / Make / Model / Row / Arrival Date header
-        tables = soup.find_all("table")
-        for table in tables:
-            header_text = table.get_text(" ", strip=True).lower()
-            if (
-                "year" in header_text
-                and "make" in header_text
-                and "model" in header_text
-            ):
-                # This looks like the inventory table
-                for tr in table.find_all("tr"):
-                    tds = tr.find_all("td")
-                    if len(tds) < 3:
-                        continue
+    return get_singleflight().do(("upull", url), _capture)
 
-                    cells = [td.get_text(" ", strip=True) for td in tds]
-                    line = " ".join(cells)
-                    low = line.lower()
 
-                    # Keyword filter (make/model words like "honda", "accord")
-                    if kw and not all(k in low for k in kw):
-                        continue
+UPULL_ISO_DATE_RE = re.compile(r"^\s*(\d{4})-(\d{1,2})-(\d{1,2})")
 
-                    # Try to extract a year from the first cell or anywhere in the line
-                    year_val = None
-                    ym = (
-                        re.search(r"\b(19\d{2}|20\d{2})\b", cells[0]) if cells else None
-                    )
-                    if ym:
-                        try:
-                            year_val = int(ym.group(1))
-                        except Exception:
-                            year_val = None
-                    if year_val is None:
-                        ym = re.search(r"\b(19\d{2}|20\d{2})\b", line)
-                        if ym:
-                            try:
-                                year_val = int(ym.group(1))
-                            except Exception:
-                                year_val = None
-
-                    # Only enforce year range if we actually found a 4-digit year
-                    if ymin is not None and ymax is not None and year_val is not None:
-                        if not (ymin <= year_val <= ymax):
-                            continue
 
-                    # Basic title: Year + Make + Model from first 3 columns
-                    title = " ".join(cells[:3]).strip()
-                    if not title:
-                        title = line[:80]
+def upull_inventory_date(value):
+    """Inventory JSON dates are ISO ("2026-01-02T08:00:00") or mm/dd/yyyy."""
+    m = UPULL_ISO_DATE_RE.match(value or "")
+    if m:
+        yy, mm, dd = map(int, m.groups())
+        return f"{yy:04d}-{mm:02d}-{dd:02d}"
+    return normalize_date(value or "")
 
-                    # Attempt to detect drivetrain string from row text
-                    drive = ""
-                    for kwd in ["AWD", "4WD", "4x4", "FWD", "RWD"]:
-                        if re.search(rf"\b{kwd}\b", line, re.IGNORECASE):
-                            drive = kwd
-                            break
 
-                    # Arrival Date is typically the last column
-                    date_found = ""
-                    if cells:
-                        for c in reversed(cells):
-                            date_found = normalize_date(c)
-                            if date_found:
-                                break
+def scan_upull_orlando(yard_name, query, want_drive):
+    """
+    Scrape U-Pull-&-Pay Orlando. The inventory page is a client-side React/JS
+    app, so it is loaded in a pooled headless browser (see BrowserPool) and
+    the vehicles are read from the inventory JSON it fetches.
 
-                    rows_out.append(
-                        {
-                            "yard": yard_name,
-                            "slug": "budget-s3",
-                            "query": query,
-                            "title": title,
-                            "link": base_url,
-                            "date_found": date_found,
-                            "drivetrain": drive,
-                            "raw_text": line,
-                            "stock": "",
-                            "row": "",
-                            "vin": None,
-                            "yard_label": yard_name,
-                            "dec_year": year_val,
-                            "dec_make": None,
-                            "dec_model": None,
-                            "dec_engine": None,
-                        }
-                    )
+    Needs `playwright` plus a browser (`playwright install chromium`);
+    without them the yard is skipped with a warning. Off unless
+    UPULL_ORLANDO_ENABLED is set, since the page URL is still unverified.
+    """
+    if not UPULL_ORLANDO_ENABLED:
+        st.warning(
+            f"{yard_name}: the U-Pull-&-Pay Orlando scraper is disabled "
+            "(set UPULL_ORLANDO_ENABLED=1 and UPULL_ORLANDO_URL); skipping this yard."
+        )
+        return []
+    if not PLAYWRIGHT_AVAILABLE:
+        st.warning(
+            f"{yard_name}: U-Pull-&-Pay Orlando needs Playwright "
+            "(`pip install playwright && playwright install chromium`); "
+            "skipping this yard."
+        )
+        return []
 
-        return rows_out
+    spec = compile_query(query)
+    url = UPULL_ORLANDO_URL.format(
+        make=quote_plus(spec.make or ""),
+        model=quote_plus(spec.model or ""),
+        query=quote_plus(spec.search_text),
+    )
 
+    try:
+        vehicles = fetch_upull_inventory(url)
     except Exception as e:
-        st.error(f"{yard_name} (Budget U Pull It S3) error: {e}")
+        st.error(f"{yard_name} error: {e}")
         return []
 
+    rows = []
+    for v in vehicles:
+        title = " ".join(p for p in (v["year"], v["make"], v["model"]) if p)
+        raw_text = " ".join(
+            p for p in (title, v["vin"], f"Row {v['row']}" if v["row"] else None) if p
+        )
+        if not spec.matches_text(raw_text.lower()):
+            continue
+        year = None
+        if v["year"] and re.fullmatch(r"\d{4}", v["year"]):
+            year = int(v["year"])
+        if year is not None and not spec.year_in_range(year):
+            continue
+        rows.append(
+            {
+                "yard": yard_name,
+                "yard_label": yard_name,
+                "slug": "upullandpay-orlando",
+                "query": query,
+                "title": title,
+                "link": url,
+                "date_found": upull_inventory_date(v["date"]),
+                "drivetrain": "",
+                "raw_text": raw_text,
+                "stock": v["stock"] or "",
+                "row": v["row"] or "",
+                "vin": v["vin"],
+                "dec_year": year,
+                "dec_make": v["make"],
+                "dec_model": v["model"],
+                "dec_engine": None,
+                "dec_drive": "",
+            }
+        )
+
+    # One batched NHTSA round trip for the kept VINs
+    apply_vin_decodes(rows)
+    return rows
 
-# --- U-Pull-&-Pay Orlando scraper ---
-def scan_upull_orlando(yard_name, query, want_drive):
-    """
-    NOTE (2025-11): U-Pull-&-Pay's Orlando inventory page is a fully client-side
-    React/JS app. The Make dropdown and the search results are loaded dynamically
-    with JavaScript after the initial HTML. Because our scraper runs purely with
-    `requests` + `BeautifulSoup` (no browser engine), we can't reliably see or
-    interact with that dynamic inventory from this environment.
 
-    To avoid confusing errors like "could not find MakeID for make 'HONDA'",
-    we currently short-circuit here. The yard will stay in your list, but this
-    function will just warn once and return no rows.
+# Stock numbers on pyp.com cards ("Stock #: 1234567"); must contain a digit
+STOCK_PATTERN = re.compile(
+    r"\bstock\s*(?:#|no\.?|number)?\s*:?\s*((?=[A-Z-]*\d)[A-Z0-9-]{4,})", re.I
+)
+
 
-    If you want true U-Pull-&-Pay support on your Mac later, we can add a
-    Playwright/Selenium-based version that spins up a headless browser locally.
+def _card_key(card):
+    """
+    ("vin", VIN) / ("stock", number) for a candidate that holds exactly one
+    vehicle, None when it has no identifier, or False when it wraps several.
     """
+    text = card.get_text(" ", strip=True)
+    vins = {m.group(0).upper() for m in VIN_PATTERN.finditer(text)}
+    vins = {v for v in vins if vin_check_digit_ok(v)}
+    if len(vins) > 1:
+        return False
+    if vins:
+        return ("vin", vins.pop())
+    stocks = {m.group(1).upper() for m in STOCK_PATTERN.finditer(text)}
+    if len(stocks) > 1:
+        return False
+    if stocks:
+        return ("stock", stocks.pop())
+    return None
 
-    st.warning(
-        f"{yard_name}: U-Pull-&-Pay Orlando uses a dynamic JS inventory. "
-        "From this Streamlit scraper we can't read it reliably yet, so this "
-        "yard is skipped for now."
-    )
-    return []
+
+def _is_ancestor(a, b):
+    return any(p is a for p in b.parents)
 
 
 def extract_cards(soup: BeautifulSoup):
+    """
+    One element per vehicle on a pyp.com results page. Candidates are
+    anchor parents plus card-like divs; nested containers of the same vehicle
+    (keyed by its VIN or stock number) collapse to the innermost one that
+    still holds a link, so a page wrapper around a single result never
+    replaces the card. Wrappers holding several vehicles are skipped.
+    """
     cards = []
 
     # Links that look like inventory detail pages
@@ -1509,32 +3694,71 @@ def extract_cards(soup: BeautifulSoup):
     ):
         cards.append(div)
 
-    # de-dupe
-    unique = []
+    # de-dupe by element, then by vehicle
+    keyed = OrderedDict()  # key -> every candidate holding that vehicle
+    unkeyed = []
     seen = set()
     for c in cards:
-        if c and id(c) not in seen:
-            seen.add(id(c))
-            unique.append(c)
-    return unique
+        if not c or id(c) in seen:
+            continue
+        seen.add(id(c))
+        key = _card_key(c)
+        if key is False:
+            continue
+        if key is None:
+            unkeyed.append(c)
+            continue
+        keyed.setdefault(key, []).append(c)
+
+    kept = []
+    for group in keyed.values():
+        linked = [c for c in group if c.name == "a" or c.find("a", href=True)]
+        pool = linked or group
+        inner = [
+            c for c in pool if not any(_is_ancestor(c, o) for o in pool if o is not c)
+        ]
+        kept.append(inner[0])
+
+    # Unidentified candidates: drop fragments of (or wrappers around) keyed
+    # cards, and keep only the innermost of any nested unkeyed chain.
+    loose = [
+        c
+        for c in unkeyed
+        if not any(_is_ancestor(k, c) or _is_ancestor(c, k) for k in kept)
+    ]
+    loose = [
+        c for c in loose if not any(_is_ancestor(c, o) for o in loose if o is not c)
+    ]
+
+    # page order, as before
+    keep_ids = {id(c) for c in kept + loose}
+    ordered = []
+    for c in cards:
+        if c and id(c) in keep_ids:
+            keep_ids.discard(id(c))
+            ordered.append(c)
+    return ordered
 
 
-def card_to_row(card, yard_name, slug, query, want_drive, search_url):
+def card_to_row(card, yard_name, slug, query, want_drive, search_url, decode=True):
+    """
+    Build a result row from one pyp.com card. With decode=False the VIN is
+    only extracted; callers batch-decode later with apply_vin_decodes().
+    """
     text = " ".join(card.get_text(" ", strip=True).split())
 
-    # Try to grab a VIN from the card text
-    vin = None
+    # Try to grab a VIN (one that passes the check digit) from the card text
     dec_year = dec_make = dec_model = dec_engine = None
     dec_drive = ""
-    m = VIN_PATTERN.search(text)
-    if m:
-        vin = m.group(0)
-        vin_info = decode_vin_nhtsa(vin)
-        dec_year = vin_info["year"]
-        dec_make = vin_info["make"]
-        dec_model = vin_info["model"]
-        dec_engine = vin_info["engine"]
-        dec_drive = vin_info.get("drive", "") or ""
+    vin = find_vin(text)
+    if vin:
+        if decode:
+            vin_info = decode_vin_nhtsa(vin)
+            dec_year = vin_info["year"]
+            dec_make = vin_info["make"]
+            dec_model = vin_info["model"]
+            dec_engine = vin_info["engine"]
+            dec_drive = vin_info.get("drive", "") or ""
 
     # link from card
     link = ""
@@ -1568,12 +3792,7 @@ def card_to_row(card, yard_name, slug, query, want_drive, search_url):
     date_found = normalize_date(text)
 
     # AWD/FWD detection from raw text (fallback)
-    drive = ""
-    if want_drive:
-        for kw in ["AWD", "4WD", "4x4", "FWD", "RWD"]:
-            if re.search(rf"\b{kw}\b", text, re.I):
-                drive = kw
-                break
+    drive = detect_drive(text) if want_drive else ""
 
     # If VIN decode gave us a drivetrain, override text-based guess
     if dec_drive:
@@ -1594,72 +3813,552 @@ def card_to_row(card, yard_name, slug, query, want_drive, search_url):
         "dec_model": dec_model,
         "dec_engine": dec_engine,
         "dec_drive": dec_drive,
+        "dec_pending": False,
     }
 
 
-def scan_yard(yard_name, slug, query, want_drive):
-    # Special-case Budget U Pull It (Winter Garden)
-    if slug == "budgetupullit":
-        return scan_budget_upullit(yard_name, query, want_drive)
+def pyp_search_url(slug, query):
+    """
+    pyp.com search URL for a target with years, drivetrain and engine variant
+    removed, so '2011-2013 Mazda 6 2.5L' and '2014 Mazda 6 3.7L' fetch the
+    same page and are told apart by their local filters.
+    """
+    search = compile_query(query).fused_search_text
+    return f"https://www.pyp.com/inventory/{slug}/?search={quote_plus(search)}"
 
-    # Special-case Budget U Pull It second location (S3 system)
-    if slug == "budget-s3":
-        return scan_budget_s3(yard_name, query, want_drive)
 
-    # Special-case U-Pull-&-Pay Orlando
-    if slug == "upullandpay-orlando":
-        return scan_upull_orlando(yard_name, query, want_drive)
+# Later result pages are fetched concurrently; the fetch layer's per-host
+# gate and rate limiter still bound what actually reaches pyp.com.
+PYP_MAX_PAGES = int(os.environ.get("PYP_MAX_PAGES", "10"))
+PYP_PAGE_WORKERS = 4
+PYP_PAGE_HREF_RE = re.compile(r"""href\s*=\s*["']([^"']*\bpage=\d+[^"']*)["']""", re.I)
+PYP_PAGE_OF_RE = re.compile(r"\bpage\s+\d+\s+of\s+(\d+)\b", re.I)
 
-    # Special-case Central Florida Pick & Pay
-    if slug == "centralfloridapickandpay":
-        return scan_central_pickandpay(yard_name, query, want_drive)
 
-    url = build_url(slug, query)
-    try:
-        r = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=20)
-        soup = BeautifulSoup(r.text, "html.parser")
-        cards = extract_cards(soup)
-        rows = [card_to_row(c, yard_name, slug, query, want_drive, url) for c in cards]
-        rows = [r for r in rows if r["link"]]
-
-        # keyword filter (make/model words)
-        kw = extract_keywords(query)
-        if kw:
-            filtered = []
-            for row in rows:
-                hay = (row.get("title", "") + " " + row.get("raw_text", "")).lower()
-                if all(k in hay for k in kw):
-                    filtered.append(row)
-            rows = filtered
-
-        # year range filter (e.g. 2011–2013)
-        ymin, ymax = parse_year_range(query)
-        if ymin is not None and ymax is not None:
-            filtered = []
-            for row in rows:
-                y = extract_year_from_row(row)
-                if y is None:
-                    continue
-                if ymin <= y <= ymax:
-                    filtered.append(row)
-            rows = filtered
-
-        # refine link per row for LKQ yards (not Budget)
-        base_search = clean_query_for_search(query)
-        if base_search and rows and slug != "budgetupullit":
-            for row in rows:
-                y = extract_year_from_row(row)
-                if y is not None:
-                    row["link"] = (
-                        f"https://www.pyp.com/inventory/{slug}/"
-                        f"?search={y}+{quote_plus(base_search)}"
-                    )
+def pyp_page_count(html_text, url):
+    """
+    Number of result pages the pyp.com search at `url` spans, from its page
+    links ("...&page=4") or a "Page 1 of 4" label; 1 when it isn't
+    paginated. Only links back to the same search count, so a `?page=12`
+    elsewhere on the page (news, other yards) is ignored. Capped at
+    PYP_MAX_PAGES.
+    """
+    here = urlsplit(url)
+    search = parse_qs(here.query).get("search")
+    pages = []
+    for href in PYP_PAGE_HREF_RE.findall(html_text):
+        link = urlsplit(urljoin(url, html.unescape(href)))
+        params = parse_qs(link.query)
+        if link.path != here.path or params.get("search", search) != search:
+            continue
+        pages += [int(n) for n in params.get("page", []) if n.isdigit()]
+    pages += [int(n) for n in PYP_PAGE_OF_RE.findall(html_text)]
+    return max(1, min(max(pages, default=1), PYP_MAX_PAGES))
 
-        return rows
 
-    except Exception as e:
-        st.error(f"{yard_name} error: {e}")
-        return []
+def pyp_page_url(url, page):
+    """URL of result page `page` for a pyp_search_url() search."""
+    return url if page <= 1 else f"{url}&page={page}"
+
+
+def iter_pyp_pages(url, slug):
+    """
+    Yields (page, page_url, text, body_hash) for page 1 of a pyp.com search,
+    then for every later page it links to. Later pages are fetched
+    concurrently and yielded as each one arrives; a failed later page is
+    reported and skipped so the pages already read still count.
+    """
+    breaker = f"yard:{slug}"
+    text, body_hash = fetch_yard_page(url, breaker=breaker)
+    yield 1, url, text, body_hash
+    if body_hash is None:
+        return
+
+    n_pages = pyp_page_count(text, url)
+    if n_pages <= 1:
+        return
+
+    # Page workers need the script context for st.warning, like scan jobs
+    ctx = get_script_run_ctx()
+
+    def _fetch(page_url):
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        return fetch_yard_page(page_url, breaker=breaker)
+
+    pages = {pyp_page_url(url, n): n for n in range(2, n_pages + 1)}
+    with ThreadPoolExecutor(max_workers=min(PYP_PAGE_WORKERS, len(pages))) as pool:
+        futures = {pool.submit(_fetch, page_url): page_url for page_url in pages}
+        for fut in as_completed(futures):
+            page_url = futures[fut]
+            try:
+                page_text, page_hash = fut.result()
+            except Exception as e:
+                st.warning(f"pyp.com page {pages[page_url]} of {url} failed: {e}")
+                continue
+            yield pages[page_url], page_url, page_text, page_hash
+
+
+def parse_pyp_cards(html_text, yard_name, slug, want_drive, url):
+    """
+    Every vehicle row on one pyp.com results page, de-duplicated, before any
+    target filtering. VINs are not decoded here.
+    """
+    soup = make_soup(html_text, parse_only=PYP_CARD_STRAINER, label="pyp")
+    cards = extract_cards(soup)
+    rows = [
+        card_to_row(c, yard_name, slug, "", want_drive, url, decode=False)
+        for c in cards
+    ]
+    rows = [r for r in rows if r["link"]]
+
+    # de-dupe (nested cards can repeat the same vehicle)
+    seen = set()
+    out = []
+    for row in rows:
+        key = row["vin"] or row["raw_text"]
+        if key not in seen:
+            seen.add(key)
+            out.append(row)
+    return out
+
+
+def filter_pyp_rows(rows, query, prepared=None):
+    """
+    Copies of the page rows that pass one target's keyword and year filters.
+    Pass `prepared` (prepare_filter_rows(rows)) when several targets filter
+    the same rows.
+    """
+    spec = compile_query(query)
+    if prepared is None:
+        prepared = prepare_filter_rows(rows)
+    # Every keyword present; a year in range required when the target has one.
+    # The spec's patterns are bound once, since this loop runs per row and target.
+    keywords_match = spec.keyword_re.match if spec.keyword_re is not None else None
+    year_match = spec.year_re.fullmatch if spec.year_re is not None else None
+    out = []
+    for row, hay, year_text in prepared:
+        if keywords_match is not None and keywords_match(hay) is None:
+            continue
+        if year_match is not None and year_match(year_text) is None:
+            continue
+        out.append(dict(row, query=query))
+    return out
+
+
+def scan_pyp_yard_batch(
+    yard_name, slug, queries, want_drive, targets=None, decode_limit=None
+):
+    """
+    LKQ Pick Your Part (pyp.com) results for several targets. Targets with
+    the same pyp_search_url share one fetch and one parse of every result
+    page (see iter_pyp_pages); each target's keyword/year filters are then
+    applied locally. Returns {query: rows}.
+    """
+    out = {q: [] for q in queries}
+    groups = OrderedDict()
+    for q in queries:
+        groups.setdefault(pyp_search_url(slug, q), []).append(q)
+
+    for url, qs in groups.items():
+        # Each page is parsed and filtered as soon as it arrives; pages are
+        # merged in page order afterwards so the output doesn't depend on
+        # which fetch finished first.
+        by_page = {}
+        try:
+            for page, page_url, text, body_hash in iter_pyp_pages(url, slug):
+                # Unchanged page (304 or same body hash): reuse the rows parsed last time
+                page_rows = cached_parse(
+                    f"pyp|{YARD_PARSE_VERSION}|{yard_name}|{page_url}|{want_drive}",
+                    body_hash,
+                    lambda: parse_pyp_cards(text, yard_name, slug, want_drive, page_url),
+                )
+                prepared = prepare_filter_rows(page_rows)
+                by_page[page] = {q: filter_pyp_rows(page_rows, q, prepared) for q in qs}
+        except Exception as e:
+            st.error(f"{yard_name} error: {e}")
+            if not by_page:
+                continue
+
+        # Listings can shift between page fetches; keep each vehicle once
+        for q in qs:
+            seen = set()
+            for page in sorted(by_page):
+                for row in by_page[page][q]:
+                    key = row["vin"] or row["raw_text"]
+                    if key not in seen:
+                        seen.add(key)
+                        out[q].append(row)
+
+    # One batched NHTSA round trip for the kept VINs of every target. Rows
+    # past decode_limit get the offline pre-decode now and a real decode
+    # later, only if they are ever displayed (see decode_pending_rows).
+    to_decode = []
+    for rows in out.values():
+        n_decode = len(rows) if decode_limit is None else max(0, decode_limit)
+        to_decode.extend(rows[:n_decode])
+        for row in rows[n_decode:]:
+            if row["vin"]:
+                pre = predecode_vin(row["vin"])
+                row["dec_year"] = pre["year"]
+                row["dec_make"] = pre["make"]
+                row["dec_pending"] = True
+    apply_vin_decodes(to_decode)
+
+    # refine link per row to the target's own search
+    for q, rows in out.items():
+        base_search = compile_query(q).search_text
+        if not base_search:
+            continue
+        for row in rows:
+            y = extract_year_from_row(row)
+            if y is not None:
+                row["link"] = (
+                    f"https://www.pyp.com/inventory/{slug}/"
+                    f"?search={y}+{quote_plus(base_search)}"
+                )
+
+    return out
+
+
+def scan_pyp_yard(yard_name, slug, query, want_drive, targets=None, decode_limit=None):
+    """LKQ Pick Your Part (pyp.com) search results for one query."""
+    return scan_pyp_yard_batch(
+        yard_name, slug, [query], want_drive, targets, decode_limit
+    )[query]
+
+
+class YardAdapter:
+    """
+    How one kind of yard is scanned, plus what the scan engine may assume
+    about it when planning jobs:
+
+      host           the host its requests go to (per-host job cap)
+      full_dump      one fetch returns the whole inventory, so every
+                     target is answered from it (one job per scan)
+      batch_queries  scan_batch() runs many targets over one session
+      fetch_key      fetch_key(slug, query): targets with equal keys
+                     share one fetch, so they are planned as one job
+      rate_limit     default requests/second for `host`
+
+    scan(yard_name, slug, query, want_drive, targets, decode_limit) -> rows
+    scan_batch(yard_name, slug, queries, want_drive, targets, decode_limit)
+        -> {query: rows}
+    """
+
+    def __init__(
+        self,
+        name,
+        host,
+        scan,
+        scan_batch=None,
+        full_dump=False,
+        batch_queries=False,
+        fetch_key=None,
+        rate_limit=None,
+    ):
+        self.name = name
+        self.host = host
+        self.scan = scan
+        self.scan_batch = scan_batch
+        self.full_dump = full_dump
+        self.batch_queries = batch_queries
+        self.fetch_key = fetch_key
+        self.rate_limit = rate_limit
+
+    def scan_many(
+        self, yard_name, slug, queries, want_drive, targets=None, decode_limit=None
+    ):
+        """{query: rows} for several targets, batched when the adapter can."""
+        if self.scan_batch is not None:
+            return self.scan_batch(
+                yard_name, slug, queries, want_drive, targets, decode_limit
+            )
+        return {
+            q: self.scan(yard_name, slug, q, want_drive, targets, decode_limit)
+            for q in queries
+        }
+
+
+YARD_ADAPTERS = {}
+
+
+def register_yard_adapter(adapter):
+    YARD_ADAPTERS[adapter.name] = adapter
+    return adapter
+
+
+# Scraper entry points wrapped to the common adapter signatures
+def _scan_budget_upullit(yard_name, slug, query, want_drive, targets, decode_limit):
+    return scan_budget_upullit(yard_name, query, want_drive)
+
+
+def _scan_budget_upullit_batch(
+    yard_name, slug, queries, want_drive, targets, decode_limit
+):
+    return scan_budget_upullit_batch(yard_name, queries, want_drive)
+
+
+def _budget_fetch_key(slug, query):
+    return budget_inventory_url(query)
+
+
+def _scan_budget_s3(yard_name, slug, query, want_drive, targets, decode_limit):
+    return scan_budget_s3(yard_name, query, want_drive)
+
+
+def _scan_budget_s3_batch(yard_name, slug, queries, want_drive, targets, decode_limit):
+    return scan_budget_s3_batch(yard_name, queries, want_drive)
+
+
+def _scan_upull_orlando(yard_name, slug, query, want_drive, targets, decode_limit):
+    return scan_upull_orlando(yard_name, query, want_drive)
+
+
+def _scan_central_pickandpay(yard_name, slug, query, want_drive, targets, decode_limit):
+    return scan_central_pickandpay(yard_name, query, want_drive, targets=targets)
+
+
+register_yard_adapter(
+    YardAdapter(
+        "pyp",
+        "www.pyp.com",
+        scan_pyp_yard,
+        scan_batch=scan_pyp_yard_batch,
+        fetch_key=pyp_search_url,
+        rate_limit=4.0,
+    )
+)
+register_yard_adapter(
+    YardAdapter(
+        "budgetupullit",
+        "budgetupullit.com",
+        _scan_budget_upullit,
+        scan_batch=_scan_budget_upullit_batch,
+        fetch_key=_budget_fetch_key,
+        rate_limit=2.0,
+    )
+)
+register_yard_adapter(
+    YardAdapter(
+        "budget-s3",
+        "budgetupullit.s3softwaresolutions.com",
+        _scan_budget_s3,
+        scan_batch=_scan_budget_s3_batch,
+        batch_queries=True,
+        rate_limit=1.0,
+    )
+)
+register_yard_adapter(
+    YardAdapter(
+        "upullandpay",
+        "upullandpay.com",
+        _scan_upull_orlando,
+        # Without {make}/{model}/{query} in the URL the capture is the whole yard
+        full_dump="{" not in UPULL_ORLANDO_URL,
+        rate_limit=0.5,
+    )
+)
+register_yard_adapter(
+    YardAdapter(
+        "cfpp",
+        "centralfloridapickandpay.com",
+        _scan_central_pickandpay,
+        full_dump=True,
+        rate_limit=1.0,
+    )
+)
+
+# Yards configured before the "adapter" key existed
+LEGACY_SLUG_ADAPTERS = {
+    "budgetupullit": "budgetupullit",
+    "budget-s3": "budget-s3",
+    "upullandpay-orlando": "upullandpay",
+    "centralfloridapickandpay": "cfpp",
+}
+DEFAULT_YARD_ADAPTER = "pyp"
+
+
+def yard_adapter(yard):
+    """
+    Adapter for a yards_config.json entry: its "adapter" key, else the legacy
+    slug mapping, else pyp.com.
+    """
+    name = yard.get("adapter") or LEGACY_SLUG_ADAPTERS.get(
+        yard.get("slug"), DEFAULT_YARD_ADAPTER
+    )
+    adapter = YARD_ADAPTERS.get(name)
+    if adapter is None:
+        raise KeyError(f"Unknown yard adapter '{name}' for {yard.get('name')}")
+    return adapter
+
+
+def yard_adapter_rate_limits():
+    """Default {host: requests_per_second} declared by the registered adapters."""
+    return {a.host: a.rate_limit for a in YARD_ADAPTERS.values() if a.rate_limit}
+
+
+############################################################
+# SCAN ENGINE
+############################################################
+
+# Bounded worker pool for SCAN NOW. Most LKQ yards share pyp.com, so the
+# per-host cap keeps us polite there while other yards' hosts run alongside.
+SCAN_MAX_WORKERS = 8
+SCAN_PER_HOST_LIMIT = 4
+
+
+def run_bounded_jobs(
+    jobs,
+    worker,
+    host_of,
+    max_workers=SCAN_MAX_WORKERS,
+    per_host_limit=SCAN_PER_HOST_LIMIT,
+):
+    """
+    Run worker(job) for every job on a bounded thread pool, with at most
+    `per_host_limit` jobs talking to the same host at once.
+
+    Yields (job_index, result) as each job finishes, so the caller can
+    advance a progress bar and still merge results in job order.
+    """
+    if not jobs:
+        return
+
+    # Worker threads need the Streamlit script context so st.warning / st.error
+    # calls inside the scrapers still render in the page.
+    ctx = get_script_run_ctx()
+
+    hosts = [host_of(job) for job in jobs]
+    host_slots = {h: threading.BoundedSemaphore(per_host_limit) for h in set(hosts)}
+
+    def _run(idx):
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        with host_slots[hosts[idx]]:
+            return worker(jobs[idx])
+
+    # Interleave submissions across hosts so a run of same-host jobs doesn't
+    # park every worker on that host's semaphore.
+    by_host = {}
+    for idx, h in enumerate(hosts):
+        by_host.setdefault(h, []).append(idx)
+    order = []
+    queues = list(by_host.values())
+    while queues:
+        for q in queues:
+            order.append(q.pop(0))
+        queues = [q for q in queues if q]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as pool:
+        futures = {pool.submit(_run, idx): idx for idx in order}
+        for fut in as_completed(futures):
+            yield futures[fut], fut.result()
+
+
+def run_scan(yard_list, queries, want_drive, on_job_done=None, decode_limit=None):
+    """
+    Scan every (yard, query) pair concurrently.
+
+    Returns (rows, history_entries). Rows are merged in yard order, then query
+    order, so the output is the same as the old sequential loop no matter which
+    job finishes first. `on_job_done(done, total)` is called after each job.
+    `decode_limit` caps NHTSA decodes per pyp.com target (None = decode all).
+    """
+    # Plan per adapter: full-inventory dumps and batch adapters get one job
+    # for every query (one fetch / one session); adapters with a fetch_key
+    # get one job per group of queries that fetch the same page; the rest
+    # one job per query.
+    jobs = []
+    for yi, y in enumerate(yard_list):
+        try:
+            adapter = yard_adapter(y)
+        except KeyError as e:
+            st.error(str(e.args[0]))
+            continue
+        if adapter.full_dump or adapter.batch_queries:
+            groups = [queries]
+        elif adapter.fetch_key is not None:
+            by_key = OrderedDict()
+            for q in queries:
+                by_key.setdefault(adapter.fetch_key(y["slug"], q), []).append(q)
+            groups = list(by_key.values())
+        else:
+            groups = [[q] for q in queries]
+        jobs.extend((yi, y["name"], y["slug"], tuple(qs), adapter) for qs in groups)
+
+    def _scan_job(job):
+        _yi, yname, slug, qs, adapter = job
+        return adapter.scan_many(
+            yname,
+            slug,
+            qs,
+            want_drive,
+            targets=queries,
+            decode_limit=decode_limit,
+        )
+
+    done = 0
+    results = {}  # (yard index, query) -> (rows, finished timestamp)
+    for idx, rows_by_query in run_bounded_jobs(
+        jobs, _scan_job, host_of=lambda job: job[4].host
+    ):
+        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        yi, qs = jobs[idx][0], jobs[idx][3]
+        for q in qs:
+            results[(yi, q)] = ((rows_by_query or {}).get(q) or [], ts)
+        done += 1
+        if on_job_done:
+            on_job_done(done, len(jobs))
+
+    # Merge in yard order, then query order, however the jobs were grouped
+    all_rows = []
+    history_entries = []
+    for yi, y in enumerate(yard_list):
+        for q in queries:
+            if (yi, q) not in results:
+                continue
+            rows, ts = results[(yi, q)]
+            all_rows.extend(rows)
+            history_entries.append(
+                {
+                    "timestamp": ts,
+                    "query": q,
+                    "yard": y["name"],
+                    "count": len(rows),
+                }
+            )
+    return all_rows, history_entries
+
+
+# eBay comps enrichment pool. Each job may hit eBay and then SerpAPI; the
+# fetch layer's per-host gates keep both hosts within their limits.
+EBAY_ENRICH_MAX_WORKERS = 8
+EBAY_ENRICH_PER_HOST_LIMIT = 6
+
+
+def iter_ebay_sold_stats(queries, max_items=15):
+    """
+    fetch_ebay_sold_stats for every query on a bounded worker pool.
+
+    Queries are grouped by canonical form first, so each unique query is
+    fetched once and its stats are broadcast to every index that asked for
+    it. Yields (query_index, stats) as each unique lookup finishes.
+    """
+    groups = {}
+    for i, q in enumerate(queries):
+        groups.setdefault(canonical_ebay_query(q), []).append(i)
+    unique = list(groups)
+
+    for j, stats in run_bounded_jobs(
+        unique,
+        lambda q: fetch_ebay_sold_stats(q, max_items=max_items),
+        host_of=lambda q: "www.ebay.com",
+        max_workers=EBAY_ENRICH_MAX_WORKERS,
+        per_host_limit=EBAY_ENRICH_PER_HOST_LIMIT,
+    ):
+        for i in groups[unique[j]]:
+            yield i, stats
 
 
 ############################################################
@@ -1770,6 +4469,66 @@ with st.sidebar.expander("Scan History"):
     else:
         st.sidebar.info("No scan history yet.")
 
+# --- Network stats: keep-alive reuse across all scrapers ---
+with st.sidebar.expander("Network stats"):
+    pool_stats = http_pool_stats()
+    if pool_stats:
+        total_req = sum(p["requests"] for p in pool_stats)
+        total_reused = sum(p["reused"] for p in pool_stats)
+        st.caption(f"{total_req} HTTP requests, {total_reused} on reused connections.")
+        st.caption(
+            f"{get_singleflight().joined} duplicate in-flight fetches shared "
+            "across sessions."
+        )
+        st.dataframe(pd.DataFrame(get_rate_limiter().snapshot()), height=150)
+        st.dataframe(pd.DataFrame(pool_stats), height=200)
+        breakers = breaker_snapshot()
+        if breakers:
+            open_names = [b["breaker"] for b in breakers if b["state"] != "closed"]
+            if open_names:
+                st.caption("Circuit open/probing: " + ", ".join(open_names))
+            st.dataframe(pd.DataFrame(breakers), height=150)
+    else:
+        st.caption("No outbound requests yet.")
+
+    # Yard page cache: conditional GETs and reused parses (don't create the
+    # store just to report on it; no file means no yard page fetched yet)
+    ystats = {}
+    if os.path.exists(YARD_HTTP_CACHE_PATH):
+        ystats = get_yard_page_cache().stats_snapshot()
+    if any(ystats.values()):
+        st.caption(
+            f"Yard pages: {ystats['not_modified']} not modified (304), "
+            f"{ystats['unchanged']} unchanged, {ystats['changed']} changed; "
+            f"{ystats['parse_hits']} parses reused."
+        )
+
+    # Headless browser pool (U-Pull-&-Pay Orlando)
+    if PLAYWRIGHT_AVAILABLE:
+        bstats = get_browser_pool().stats_snapshot()
+        if bstats["pages"]:
+            st.caption(
+                f"Browser pool: {bstats['pages']} pages on {bstats['contexts']} "
+                f"warm contexts, {bstats['blocked']} asset/analytics requests blocked."
+            )
+
+    # HTML parse cost per scraper (backend: lxml when installed)
+    parse_stats = get_parse_stats().snapshot()
+    if parse_stats:
+        st.caption(f"HTML parser: {PARSER_BACKEND}")
+        st.dataframe(pd.DataFrame(parse_stats), height=150)
+
+    # VIN decode cache hit rates for the last scan (exact VIN vs squish VIN)
+    dstats = st.session_state.get("scan_decode_stats")
+    if dstats:
+        local = dstats.get("vin_hits", 0) + dstats.get("squish_hits", 0)
+        total_dec = local + dstats.get("network_decodes", 0)
+        st.caption(
+            f"Last scan VIN decodes: {local}/{total_dec} answered locally "
+            f"({dstats.get('vin_hits', 0)} exact, {dstats.get('squish_hits', 0)} squish), "
+            f"{dstats.get('network_decodes', 0)} from NHTSA."
+        )
+
 # Only render the Query Builder + SCAN controls when we're on the SCAN tab
 top_scan = False
 
@@ -1985,37 +4744,26 @@ if _active_tab == "SCAN":
             st.error("Add at least one target with the Query Builder above.")
             st.session_state["scan_rows"] = []
         else:
-            all_rows = []
-            total = len(selected_yards) * len(effective_queries)
-            step = 0
             prog = st.progress(0.0)
-            # --- Scan history tracking ---
-            history_entries = []
-
-            for yname in selected_yards:
-                yard = yard_map[yname]
-                slug = yard["slug"]
-                for q in effective_queries:
-                    rows = scan_yard(
-                        yard_name=yname,
-                        slug=slug,
-                        query=q,
-                        want_drive=want_drive,
-                    )
-                    # Log this scan to history
-                    history_entries.append(
-                        {
-                            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                            "query": q,
-                            "yard": yname,
-                            "count": len(rows),
-                        }
-                    )
-                    all_rows.extend(rows)
-                    step += 1
-                    prog.progress(step / total)
+            decode_stats_before = get_vin_cache().stats_snapshot()
+
+            # Only rows that can reach the results table are VIN-decoded up
+            # front, unless a drivetrain/engine filter needs every decode.
+            needs_all_decodes = drive_filter != "Any" or bool(engine_filter)
+
+            # Concurrent scan; rows + history come back merged in yard/query order
+            all_rows, history_entries = run_scan(
+                [yard_map[yname] for yname in selected_yards],
+                effective_queries,
+                want_drive=want_drive,
+                on_job_done=lambda done, total: prog.progress(done / total),
+                decode_limit=None if needs_all_decodes else int(limit),
+            )
 
             st.session_state["scan_rows"] = all_rows
+            st.session_state["scan_decode_stats"] = vin_decode_stats_delta(
+                decode_stats_before, get_vin_cache().stats_snapshot()
+            )
             # Write scan history to CSV
             if history_entries:
                 hist_df = pd.DataFrame(history_entries)
@@ -2095,9 +4843,13 @@ if _active_tab == "RESULTS":
                 candidates = matrix_source_df.head(int(max_rows_pm)).to_dict("records")
                 pm_profiles_from_scan = []
 
-                for row in candidates:
-                    ebay_q = build_ebay_query_from_row(row)
-                    stats = fetch_ebay_sold_stats(ebay_q, max_items=20)
+                # One comps lookup per unique query, shared by matching rows
+                cand_queries = [build_ebay_query_from_row(row) for row in candidates]
+                cand_stats = dict(iter_ebay_sold_stats(cand_queries, max_items=20))
+
+                for i, row in enumerate(candidates):
+                    ebay_q = cand_queries[i]
+                    stats = cand_stats[i]
                     avg_price = stats.get("avg_price")
                     sold_count = stats.get("count", 0)
 
@@ -2599,10 +5351,16 @@ if _active_tab == "MATRIX":
                     if isinstance(feat, str) and feat.strip():
                         module_defs.append((f"Feature: {feat.strip()}", feat.strip()))
 
+                # Fetch every module's comps concurrently, once per unique query
+                mod_queries = [
+                    f"{year} {make} {model} {keyword}" for _, keyword in module_defs
+                ]
+                mod_stats = dict(iter_ebay_sold_stats(mod_queries, max_items=20))
+
                 rows_mod = []
-                for label, keyword in module_defs:
-                    q = f"{year} {make} {model} {keyword}"
-                    stats = fetch_ebay_sold_stats(q, max_items=20)
+                for i, (label, keyword) in enumerate(module_defs):
+                    q = mod_queries[i]
+                    stats = mod_stats[i]
                     avg_price = stats.get("avg_price")
                     sold_count = stats.get("count", 0)
 
@@ -2781,7 +5539,16 @@ if _active_tab == "MATRIX":
             st.info("Overnight sniper file is present but empty.")
 
 if _active_tab == "RESULTS" and all_rows:
+    # Filters changed since the scan: drivetrain/engine need every decode
+    if drive_filter != "Any" or engine_filter:
+        decode_pending_rows(all_rows)
+
     df = pd.DataFrame(all_rows)
+    pending_mask = (
+        df.pop("dec_pending").eq(True)
+        if "dec_pending" in df.columns
+        else pd.Series(False, index=df.index)
+    )
 
     # Prefer VIN-based dedupe so Budget rows don't collapse into 1
     if "vin" in df.columns:
@@ -2844,6 +5611,22 @@ if _active_tab == "RESULTS" and all_rows:
         else:
             df_show = df.copy()
 
+        # Decode the displayed rows that the scan left pending
+        pending_idx = [i for i in df_show.index if pending_mask.get(i, False)]
+        if pending_idx:
+            decode_pending_rows([all_rows[i] for i in pending_idx])
+            for i in pending_idx:
+                for col in (
+                    "dec_year",
+                    "dec_make",
+                    "dec_model",
+                    "dec_engine",
+                    "dec_drive",
+                    "drivetrain",
+                ):
+                    if col in df_show.columns:
+                        df_show.at[i, col] = all_rows[i].get(col)
+
         # Add a 'buy' column for shortlist selection (if not already present)
         if "buy" not in df_show.columns:
             df_show.insert(0, "buy", False)
@@ -2931,13 +5714,32 @@ if _active_tab == "RESULTS" and all_rows:
             if "ebay_sold_count" not in df_show.columns:
                 df_show["ebay_sold_count"] = 0
 
-            # Only fetch stats for up to `limit` visible rows
+            # Only fetch stats for up to `limit` visible rows, concurrently and
+            # once per unique query. The rows are shown right away in a
+            # read-only preview that fills in as comps arrive; the editable
+            # table below replaces it once every lookup is done.
             sample_df = df_show.head(limit).copy()
-            for idx, row in sample_df.iterrows():
-                q = build_ebay_query_from_row(row.to_dict())
-                stats = fetch_ebay_sold_stats(q, max_items=10)
-                df_show.at[idx, "ebay_avg_sold"] = stats.get("avg_price")
-                df_show.at[idx, "ebay_sold_count"] = stats.get("count", 0)
+            row_idx = list(sample_df.index)
+            row_queries = [
+                build_ebay_query_from_row(row.to_dict())
+                for _, row in sample_df.iterrows()
+            ]
+            enrich_prog = st.progress(0.0)
+            live_table = st.empty()
+            live_table.dataframe(df_show, use_container_width=True)
+            last_draw = time.monotonic()
+            for done, (j, stats) in enumerate(
+                iter_ebay_sold_stats(row_queries, max_items=10), start=1
+            ):
+                df_show.at[row_idx[j], "ebay_avg_sold"] = stats.get("avg_price")
+                df_show.at[row_idx[j], "ebay_sold_count"] = stats.get("count", 0)
+                enrich_prog.progress(done / len(row_queries))
+                # Redraw at most twice a second; cache hits arrive in bursts
+                if time.monotonic() - last_draw >= 0.5:
+                    live_table.dataframe(df_show, use_container_width=True)
+                    last_draw = time.monotonic()
+            enrich_prog.empty()
+            live_table.empty()
 
         # 🔹 Profit metrics based on eBay comps and your cost/shipping
         FEE_RATE = 0.1495  # 14.95% marketplace fee assumption
@@ -0,0 +1,104 @@
+import logging
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "integration: manual test against real external tooling (opt-in)"
+    )
+
+
+@pytest.fixture(scope="session")
+def app():
+    """streamlit_app imported in bare mode (the UI script runs once, headless)."""
+    logging.disable(logging.WARNING)
+    cwd = os.getcwd()
+    os.chdir(ROOT)  # load_yards() reads yards_config.json from the cwd
+    try:
+        import streamlit_app
+    finally:
+        os.chdir(cwd)
+    return streamlit_app
+
+
+@pytest.fixture
+def isolated(app, tmp_path, monkeypatch):
+    """Fresh on-disk caches, breakers and rate limits for one test."""
+    vin_cache = app.VinDecodeCache(str(tmp_path / "vin.sqlite3"))
+    page_cache = app.YardPageCache(str(tmp_path / "pages.sqlite3"))
+    limiter = app.HostRateLimiter({"127.0.0.1": 1000.0})
+    monkeypatch.setattr(app, "get_vin_cache", lambda: vin_cache)
+    monkeypatch.setattr(app, "get_yard_page_cache", lambda: page_cache)
+    monkeypatch.setattr(app, "get_rate_limiter", lambda: limiter)
+    breakers = app._breaker_registry()["breakers"]
+    saved = dict(breakers)
+    breakers.clear()
+    yield app
+    breakers.clear()
+    breakers.update(saved)
+
+
+@pytest.fixture
+def stub_server():
+    """
+    Local HTTP server; `handler(method, path, body)` returns
+    (status, headers, body). Yields (base_url, requests_seen, set_handler).
+    """
+    seen = []
+    state = {"handler": lambda method, path, body: (404, {}, b"")}
+
+    class Handler(BaseHTTPRequestHandler):
+        def _serve(self, method):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            seen.append((method, self.path, body))
+            status, headers, payload = state["handler"](method, self.path, body)
+            if isinstance(payload, str):
+                payload = payload.encode()
+            self.send_response(status)
+            for k, v in headers.items():
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            self._serve("GET")
+
+        def do_POST(self):
+            self._serve("POST")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def set_handler(fn):
+        state["handler"] = fn
+
+    yield f"http://127.0.0.1:{server.server_port}", seen, set_handler
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def make_vin(app):
+    """make_vin(prefix8, rest8): a 17-char VIN with the check digit filled in."""
+
+    def _make(prefix, rest):
+        for d in "0123456789X":
+            vin = f"{prefix}{d}{rest}"
+            if app.vin_check_digit_ok(vin):
+                return vin
+        raise ValueError(prefix + rest)
+
+    return _make
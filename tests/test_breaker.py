@@ -0,0 +1,45 @@
+import pytest
+
+
+def test_non_request_exception_in_half_open_probe_reopens(isolated, monkeypatch):
+    app = isolated
+
+    class Boom(Exception):
+        pass
+
+    class ExplodingSession:
+        def request(self, *args, **kwargs):
+            raise Boom("response hook failed")
+
+    cb = app.get_breaker("yard:test")
+    cb.state = cb.OPEN
+    cb.opened_at = 0.0  # reset_timeout long past: next call is the probe
+
+    with pytest.raises(Boom):
+        app._send("GET", "http://127.0.0.1:9/x", breaker="yard:test", session=ExplodingSession())
+    assert cb.state == cb.OPEN
+    assert not cb._probing
+
+    # After the reset timeout another probe is allowed again
+    cb.opened_at = 0.0
+    assert cb.allow()
+
+
+def test_breaker_opens_after_threshold_and_fails_fast(isolated):
+    app = isolated
+
+    class DownSession:
+        calls = 0
+
+        def request(self, *args, **kwargs):
+            DownSession.calls += 1
+            raise app.requests.ConnectionError("down")
+
+    cb = app.get_breaker("yard:down")
+    for _ in range(cb.failure_threshold):
+        with pytest.raises(app.requests.ConnectionError):
+            app._send("GET", "http://127.0.0.1:9/x", breaker="yard:down", session=DownSession())
+    assert cb.state == cb.OPEN
+    with pytest.raises(app.CircuitOpenError):
+        app._send("GET", "http://127.0.0.1:9/x", breaker="yard:down", session=DownSession())
+    assert DownSession.calls == cb.failure_threshold
@@ -0,0 +1,30 @@
+import json
+import time
+
+
+def test_legacy_json_keys_are_canonicalized_on_import(app, tmp_path, monkeypatch):
+    now = time.time()
+    legacy = tmp_path / "ebay_cache.json"
+    legacy.write_text(
+        json.dumps(
+            {
+                "Honda Accord": {"avg_price": 120.0, "count": 7, "timestamp": now - 60},
+                "honda  accord": {"avg_price": 95.0, "count": 3, "timestamp": now - 3600},
+                "Kia Sorento": {"avg_price": 80.0, "count": 2, "timestamp": now - 2 * 86400},
+            }
+        )
+    )
+    monkeypatch.setattr(app, "EBAY_LEGACY_CACHE_FILE", str(legacy))
+    store = app.CompsStore(str(tmp_path / "comps.sqlite3"))
+    monkeypatch.setattr(app, "get_comps_store", lambda: store)
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("legacy entry should have been a store hit")
+
+    monkeypatch.setattr(app, "_fetch_ebay_sold_stats_live", no_network)
+
+    # The newest of the entries that share a canonical key wins
+    assert store.get("honda accord") == {"avg_price": 120.0, "count": 7}
+    assert app.fetch_ebay_sold_stats("Honda Accord") == {"avg_price": 120.0, "count": 7}
+    # Expired legacy entries are imported but not served
+    assert store.get("kia sorento") is None
@@ -0,0 +1,68 @@
+SEARCH_URL = "https://www.pyp.com/inventory/orlando-1134/?search=honda+accord"
+
+
+def _card(i, vin, year=2012):
+    return (
+        f'<div class="vehicle-card"><a href="/inventory/orlando-1134/vehicle/{i}">'
+        f"<h3>{year} HONDA ACCORD</h3></a>"
+        f'<div class="vehicle-details"><p>VIN {vin}</p><p>Stock # 1134-{i:05d}</p>'
+        f"<p>Row {i}</p><p>Arrived 12/{10 + i}/2025</p></div></div>"
+    )
+
+
+def _page(cards):
+    return (
+        "<html><body>"
+        '<div class="inventory-results"><h1>Orlando Inventory - updated 01/02/2026</h1>'
+        + "".join(cards)
+        + "</div></body></html>"
+    )
+
+
+def test_single_result_page_keeps_the_card_not_the_page_wrapper(app, make_vin):
+    vin = make_vin("1HGCP26M", "CA012345")
+    rows = app.parse_pyp_cards(
+        _page([_card(1, vin)]), "Orlando", "orlando-1134", True, SEARCH_URL
+    )
+
+    assert len(rows) == 1
+    row = rows[0]
+    assert row["title"] == "2012 HONDA ACCORD"
+    assert row["link"] == "https://www.pyp.com/inventory/orlando-1134/vehicle/1"
+    assert row["date_found"] == app.normalize_date("12/11/2025")
+    assert row["vin"] == vin
+    # The year comes from the card, so a ranged target still keeps it
+    assert len(app.filter_pyp_rows(rows, "2011-2013 Honda Accord")) == 1
+
+
+def test_every_vehicle_on_a_multi_result_page_is_one_row(app, make_vin):
+    vins = [make_vin("1HGCP26M", f"CA{n:06d}") for n in range(1, 6)]
+    rows = app.parse_pyp_cards(
+        _page([_card(i, v, 2009 + i) for i, v in enumerate(vins)]),
+        "Orlando",
+        "orlando-1134",
+        True,
+        SEARCH_URL,
+    )
+
+    assert [r["vin"] for r in rows] == vins
+    assert [r["title"] for r in rows] == [f"{2009 + i} HONDA ACCORD" for i in range(5)]
+    assert all("/vehicle/" in r["link"] for r in rows)
+
+
+def test_page_count_only_follows_links_back_to_the_same_search(app):
+    pagination = (
+        '<nav class="pagination">'
+        '<a href="/inventory/orlando-1134/?search=honda+accord&amp;page=2">2</a>'
+        '<a href="?search=honda+accord&amp;page=3">3</a>'
+        "</nav>"
+    )
+    unrelated = (
+        '<a href="/news/?page=12">Older posts</a>'
+        '<a href="/inventory/tampa-1180/?search=honda+accord&page=12">Tampa</a>'
+        '<a href="/inventory/orlando-1134/?search=kia+sorento&page=12">Sorento</a>'
+    )
+    page = _page([]) + pagination + unrelated
+
+    assert app.pyp_page_count(page, SEARCH_URL) == 3
+    assert app.pyp_page_count(_page([]) + unrelated, SEARCH_URL) == 1
@@ -0,0 +1,57 @@
+import pytest
+
+
+@pytest.mark.parametrize(
+    "query, fused",
+    [
+        ("2011-2013 Kia Sorento 3.5L V6", "kia sorento"),
+        ("2010-2013 Mazda 6 2.5L", "mazda 6"),
+        ("Honda Accord 4cyl", "honda accord"),
+        ("Honda Accord I-4", "honda accord"),
+        ("Volvo V70", "volvo v70"),
+        ("Infiniti I35", "infiniti i35"),
+        ("BMW i3", "bmw i3"),
+        # I4 is a layout token, but here it is the only model token
+        ("BMW i4", "bmw i4"),
+    ],
+)
+def test_fused_search_text_keeps_model_names(app, query, fused):
+    assert app.compile_query(query).fused_search_text == fused
+
+
+def test_engine_variants_share_one_pyp_search(app):
+    a = app.pyp_search_url("orlando-1134", "2011-2013 Kia Sorento 3.5L")
+    b = app.pyp_search_url("orlando-1134", "2014-2016 Kia Sorento 2.4L")
+    c = app.pyp_search_url("orlando-1134", "Volvo V70")
+    d = app.pyp_search_url("orlando-1134", "Volvo V90")
+    assert a == b
+    assert c != d
+
+
+def test_compile_query_memo_is_a_cached_resource(app):
+    """A rerun re-executes the script; the memo must live outside it."""
+    spec = app.compile_query("2011-2013 Kia Sorento AWD")
+    assert app.compile_query("2011-2013 Kia Sorento AWD") is spec
+    assert app._query_spec_cache()["specs"]["2011-2013 Kia Sorento AWD"] is spec
+    # st.cache_resource hands back the same store on every call / rerun
+    assert app._query_spec_cache() is app._query_spec_cache()
+    assert (spec.ymin, spec.ymax, spec.keywords) == (2011, 2013, ("kia", "sorento"))
+
+
+def test_spec_patterns_filter_prepared_rows(app):
+    spec = app.compile_query("2011-2013 Kia Sorento 3.5L")
+    assert spec.keyword_re.match("2012 kia sorento lx")
+    assert spec.keyword_re.match("sorento (kia) 2012")
+    assert spec.keyword_re.match("2012 kia optima") is None
+    assert spec.year_re.fullmatch("2013") and spec.year_re.fullmatch("2014") is None
+    assert app.compile_query("Kia Sorento").year_re is None
+
+    rows = [
+        {"title": "2012 KIA SORENTO", "raw_text": "Row 4"},
+        {"title": "2014 KIA SORENTO", "raw_text": "Row 5"},
+        {"title": "KIA SORENTO", "raw_text": "no year listed"},
+        {"title": "2012 KIA OPTIMA", "raw_text": "Row 6"},
+    ]
+    kept = app.filter_pyp_rows(rows, spec.query)
+    assert [r["title"] for r in kept] == ["2012 KIA SORENTO"]
+    assert len(app.filter_pyp_rows(rows, "Kia Sorento")) == 3
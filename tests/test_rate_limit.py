@@ -0,0 +1,38 @@
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+
+class _Response:
+    def __init__(self, status_code, retry_after=None):
+        self.status_code = status_code
+        self.headers = {"Retry-After": retry_after} if retry_after is not None else {}
+        self.text = ""
+
+
+def test_parse_retry_after_clamps_and_rejects_garbage(app):
+    assert app.parse_retry_after("5") == 5.0
+    assert app.parse_retry_after("86400") == app.RETRY_AFTER_MAX
+    assert app.parse_retry_after("not a date") is None
+    assert app.parse_retry_after("") is None
+    assert app.parse_retry_after("-3") is None
+
+    soon = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 0 < app.parse_retry_after(soon) <= 30
+    far = format_datetime(datetime.now(timezone.utc) + timedelta(days=1), usegmt=True)
+    assert app.parse_retry_after(far) == app.RETRY_AFTER_MAX
+
+
+def test_huge_retry_after_pauses_host_at_most_the_cap(app):
+    limiter = app.HostRateLimiter({"example.test": 2.0})
+    assert limiter.report("example.test", _Response(429, "86400"))
+    bucket = limiter.bucket("example.test")
+    assert bucket.paused_until - time.monotonic() <= app.RETRY_AFTER_MAX + 1
+
+
+def test_bad_retry_after_uses_default_backoff(app):
+    limiter = app.HostRateLimiter({"example.test": 2.0})
+    limiter.report("example.test", _Response(503, "Wed, 99 Foo 2026"))
+    bucket = limiter.bucket("example.test")
+    # Default backoff: one token interval at the halved rate
+    assert bucket.paused_until - time.monotonic() <= 1.0 / bucket.rate + 0.1
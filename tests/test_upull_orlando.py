@@ -0,0 +1,262 @@
+import json
+import os
+
+import pytest
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "upull_orlando")
+
+
+def _fixture(name, mode="r"):
+    with open(os.path.join(FIXTURES, name), mode) as f:
+        return f.read()
+
+
+@pytest.fixture
+def inventory_json():
+    return json.loads(_fixture("inventory.json"))
+
+
+class FakePool:
+    """Stands in for BrowserPool: returns the fixture JSON as the captured body."""
+
+    def __init__(self, bodies):
+        self.bodies = bodies
+        self.urls = []
+
+    def capture_json(self, url, url_pattern, timeout=120):
+        self.urls.append(url)
+        return self.bodies
+
+
+def test_iter_inventory_vehicles_reads_any_key_style(app, inventory_json):
+    recs = list(app.iter_inventory_vehicles(inventory_json))
+
+    assert [r["stock"] for r in recs] == ["O-1001", "O-1002", "O-1003", "O-1001", "O-1004"]
+    nested = recs[1]
+    assert nested["vin"] == "1HGCP36B3EA654321"
+    assert (nested["year"], nested["make"], nested["model"]) == ("2014", "HONDA", "ACCORD")
+    assert (nested["row"], nested["date"]) == ("22", "12/30/2025")
+    # A bad VIN is dropped, but year + make + model still make it a vehicle
+    assert recs[4]["vin"] is None and recs[4]["year"] == "2013"
+
+
+def test_scan_filters_and_dedupes_the_captured_inventory(
+    isolated, inventory_json, monkeypatch
+):
+    app = isolated
+    pool = FakePool([inventory_json])
+    monkeypatch.setattr(app, "UPULL_ORLANDO_ENABLED", True)
+    monkeypatch.setattr(app, "PLAYWRIGHT_AVAILABLE", True)
+    monkeypatch.setattr(app, "get_browser_pool", lambda: pool)
+    monkeypatch.setattr(app, "apply_vin_decodes", lambda rows: rows)
+    app._upull_snapshot_holder()["snapshots"].clear()
+
+    rows = app.scan_upull_orlando("U-Pull-&-Pay Orlando", "2012-2013 Honda Accord", True)
+
+    assert [(r["stock"], r["dec_year"], r["row"]) for r in rows] == [
+        ("O-1001", 2012, "14"),
+        ("O-1004", 2013, "9"),
+    ]
+    assert rows[0]["date_found"] == "2026-01-02"
+    assert all(r["yard_label"] == "U-Pull-&-Pay Orlando" for r in rows)
+    assert all(r["query"] == "2012-2013 Honda Accord" for r in rows)
+
+    # Another target on the same page URL is answered from the snapshot
+    newer = app.scan_upull_orlando("U-Pull-&-Pay Orlando", "2014 Honda Accord", True)
+    assert [r["stock"] for r in newer] == ["O-1002"]
+    assert len(pool.urls) == 1
+
+    kia = app.scan_upull_orlando("U-Pull-&-Pay Orlando", "Kia Sorento", True)
+    assert [r["stock"] for r in kia] == ["O-1003"]
+    assert len(pool.urls) == 2
+
+
+def test_scan_is_off_until_enabled(isolated, inventory_json, monkeypatch):
+    app = isolated
+    pool = FakePool([inventory_json])
+    monkeypatch.setattr(app, "UPULL_ORLANDO_ENABLED", False)
+    monkeypatch.setattr(app, "PLAYWRIGHT_AVAILABLE", True)
+    monkeypatch.setattr(app, "get_browser_pool", lambda: pool)
+
+    assert app.scan_upull_orlando("U-Pull-&-Pay Orlando", "Honda Accord", True) == []
+    assert pool.urls == []
+
+
+# Drives a real Chromium: RUN_BROWSER_TESTS=1 pytest -m integration
+@pytest.mark.integration
+@pytest.mark.skipif(
+    os.environ.get("RUN_BROWSER_TESTS") != "1",
+    reason="manual browser test; set RUN_BROWSER_TESTS=1 (needs playwright install chromium)",
+)
+def test_browser_pool_against_fixture_site(app, stub_server, monkeypatch):
+    base, seen, set_handler = stub_server
+    page = _fixture("inventory.html", "rb")
+    data = _fixture("inventory.json", "rb")
+
+    def handler(method, path, body):
+        if path.startswith("/api/inventory.json"):
+            return 200, {"Content-Type": "application/json"}, data
+        if path.startswith("/static/"):
+            return 200, {"Content-Type": "image/png"}, b"\x89PNG"
+        return 200, {"Content-Type": "text/html"}, page
+
+    set_handler(handler)
+    monkeypatch.setattr(app, "BROWSER_CONTEXT_MAX_PAGES", 1)
+    pool = app.BrowserPool(workers=1)
+    try:
+        for _ in range(3):
+            bodies = pool.capture_json(base + "/", app.UPULL_INVENTORY_JSON_RE)
+            assert bodies == [json.loads(data)]
+        stats = pool.stats_snapshot()
+        assert stats["pages"] == 3
+        # One context per page with a one-page budget: recycled twice
+        assert stats["contexts"] == 3
+        # The image and the analytics script never left the browser
+        assert stats["blocked"] >= 2
+        assert not any(p.startswith("/static/") for _, p, _ in seen)
+    finally:
+        pool.close()
+    assert not any(t.is_alive() for t in pool._threads)
+
+
+def test_browser_pool_without_browser_fails_fast(app, monkeypatch):
+    class NoBrowser:
+        def start(self):
+            raise RuntimeError("Executable doesn't exist")
+
+    monkeypatch.setattr(app, "sync_playwright", lambda: NoBrowser(), raising=False)
+    pool = app.BrowserPool(workers=1)
+    try:
+        with pytest.raises(RuntimeError, match="headless browser unavailable"):
+            pool.capture_json("http://127.0.0.1:9/", app.UPULL_INVENTORY_JSON_RE, timeout=10)
+    finally:
+        pool.close()
+    assert not any(t.is_alive() for t in pool._threads)
+
+
+class _FakeRequest:
+    def __init__(self, url, resource_type):
+        self.url = url
+        self.resource_type = resource_type
+
+
+class _FakeRoute:
+    def __init__(self, request, log):
+        self.request = request
+        self._log = log
+
+    def abort(self):
+        self._log.append(("abort", self.request.url))
+
+    def continue_(self):
+        self._log.append(("continue", self.request.url))
+
+
+class _FakeResponse:
+    def __init__(self, url, body):
+        self.url = url
+        self.headers = {"content-type": "application/json"}
+        self._body = body
+
+    def json(self):
+        return self._body
+
+
+class _FakePage:
+    """Replays the fixture page's requests through the context's route handler."""
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+        self.handlers = []
+        self.closed = False
+
+    def on(self, event, handler):
+        self.handlers.append(handler)
+
+    def goto(self, url, wait_until=None, timeout=None):
+        requests = [
+            (url, "document"),
+            (url + "static/logo.png", "image"),
+            ("https://www.googletagmanager.com/gtag/js", "script"),
+            (url + "api/inventory.json", "fetch"),
+        ]
+        for req_url, rtype in requests:
+            self.ctx.route_handler(_FakeRoute(_FakeRequest(req_url, rtype), self.ctx.log))
+        for handler in self.handlers:
+            handler(_FakeResponse(url + "api/inventory.json", self.ctx.body))
+
+    def close(self):
+        self.closed = True
+
+
+class _FakeContext:
+    def __init__(self, body, log):
+        self.body = body
+        self.log = log
+        self.closed = False
+        self.route_handler = None
+
+    def route(self, pattern, handler):
+        self.route_handler = handler
+
+    def new_page(self):
+        return _FakePage(self)
+
+    def close(self):
+        self.closed = True
+
+
+class _FakePlaywright:
+    def __init__(self, body):
+        self.body = body
+        self.contexts = []
+        self.log = []
+        self.stopped = False
+        self.chromium = self
+
+    def start(self):
+        return self
+
+    def launch(self, headless=True):
+        return self
+
+    def new_context(self, user_agent=None):
+        ctx = _FakeContext(self.body, self.log)
+        self.contexts.append(ctx)
+        return ctx
+
+    def close(self):
+        pass
+
+    def stop(self):
+        self.stopped = True
+
+
+def test_browser_pool_recycles_contexts_and_shuts_down(app, inventory_json, monkeypatch):
+    fake = _FakePlaywright(inventory_json)
+    monkeypatch.setattr(app, "sync_playwright", lambda: fake, raising=False)
+    monkeypatch.setattr(app, "BROWSER_CONTEXT_MAX_PAGES", 2)
+    pool = app.BrowserPool(workers=1)
+    try:
+        for _ in range(5):
+            assert pool.capture_json("http://fixture.test/", app.UPULL_INVENTORY_JSON_RE) == [
+                inventory_json
+            ]
+        stats = pool.stats_snapshot()
+    finally:
+        pool.close()
+
+    # Five pages on a two-page budget: contexts for pages 1-2, 3-4 and 5
+    assert stats["pages"] == 5
+    assert stats["contexts"] == len(fake.contexts) == 3
+    assert all(ctx.closed for ctx in fake.contexts)
+    assert fake.stopped
+    assert not any(t.is_alive() for t in pool._threads)
+
+    # Images and analytics are aborted; the document and the JSON go through
+    aborted = {url for action, url in fake.log if action == "abort"}
+    assert aborted == {
+        "http://fixture.test/static/logo.png",
+        "https://www.googletagmanager.com/gtag/js",
+    }
+    assert stats["blocked"] == 2 * 5
@@ -0,0 +1,95 @@
+import json
+from urllib.parse import parse_qs
+
+
+def _vpic_result(vin, make, model):
+    return {
+        "VIN": vin,
+        "ModelYear": "2014",
+        "Make": make,
+        "Model": model,
+        "DisplacementL": "3.5",
+        "EngineCylinders": "6",
+        "DriveType": "AWD/All-Wheel Drive",
+    }
+
+
+def _vpic_handler(catalog, batch_status=200, omit=()):
+    """Stub vPIC: batch POST answers every known VIN except `omit`."""
+
+    def handler(method, path, body):
+        if method == "POST" and path.startswith("/DecodeVINValuesBatch/"):
+            if batch_status != 200:
+                return batch_status, {}, b"upstream error"
+            vins = parse_qs(body.decode())["data"][0].split(";")
+            results = [
+                _vpic_result(v, *catalog[v]) for v in vins if v in catalog and v not in omit
+            ]
+            return 200, {"Content-Type": "application/json"}, json.dumps({"Results": results})
+        if method == "GET" and path.startswith("/decodevinvalues/"):
+            vin = path.split("/")[2].split("?")[0]
+            if vin not in catalog:
+                return 404, {}, b""
+            return 200, {}, json.dumps({"Results": [_vpic_result(vin, *catalog[vin])]})
+        return 404, {}, b""
+
+    return handler
+
+
+def test_mixed_batch_uses_batch_endpoint_and_falls_back_per_vin(
+    isolated, stub_server, make_vin, monkeypatch
+):
+    app = isolated
+    base, seen, set_handler = stub_server
+    monkeypatch.setattr(app, "NHTSA_VPIC_BASE", base)
+
+    sorento = make_vin("5XYKUDA2", "EG123456")
+    accord = make_vin("1HGCP36B", "EA654321")
+    bad_check = sorento[:8] + ("0" if sorento[8] != "0" else "1") + sorento[9:]
+    catalog = {sorento: ("KIA", "Sorento"), accord: ("HONDA", "Accord")}
+    set_handler(_vpic_handler(catalog, omit={accord}))
+
+    out = app.decode_vins_batch([sorento, accord, bad_check, "SHORT", sorento])
+
+    posts = [s for s in seen if s[0] == "POST"]
+    gets = [s for s in seen if s[0] == "GET"]
+    assert len(posts) == 1
+    sent = parse_qs(posts[0][2].decode())["data"][0].split(";")
+    # Invalid VINs never reach NHTSA; duplicates are sent once
+    assert sent == [sorento, accord]
+    # The VIN the batch left out is decoded on its own
+    assert [g[1].split("/")[2].split("?")[0] for g in gets] == [accord]
+
+    assert out[sorento]["make"] == "KIA" and out[sorento]["year"] == 2014
+    assert out[sorento]["drive"] == app.normalize_drive_label("AWD")
+    assert out[accord]["model"] == "Accord"
+    assert out[bad_check] == app._empty_vin_info()
+    assert out["SHORT"] == app._empty_vin_info()
+
+    # Everything is cached now: a second pass costs no requests
+    seen.clear()
+    again = app.decode_vins_batch([sorento, accord])
+    assert seen == []
+    assert again[accord]["make"] == "HONDA"
+
+
+def test_failed_batch_falls_back_to_single_decodes(
+    isolated, stub_server, make_vin, monkeypatch
+):
+    app = isolated
+    base, seen, set_handler = stub_server
+    monkeypatch.setattr(app, "NHTSA_VPIC_BASE", base)
+
+    sorento = make_vin("5XYKUDA2", "EG123456")
+    accord = make_vin("1HGCP36B", "EA654321")
+    catalog = {sorento: ("KIA", "Sorento"), accord: ("HONDA", "Accord")}
+    set_handler(_vpic_handler(catalog, batch_status=500))
+
+    out = app.decode_vins_batch([sorento, accord])
+
+    assert [s[0] for s in seen].count("POST") == 1
+    assert sorted(s[1].split("/")[2].split("?")[0] for s in seen if s[0] == "GET") == sorted(
+        [sorento, accord]
+    )
+    assert out[sorento]["make"] == "KIA"
+    assert out[accord]["make"] == "HONDA"
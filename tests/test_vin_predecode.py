@@ -0,0 +1,32 @@
+import pytest
+
+
+@pytest.mark.parametrize(
+    "vin, target_make",
+    [
+        ("2C3CDXBG4EH123456", "DODGE"),  # Charger: 2C3 is Chrysler and Dodge
+        ("JN1BV7AR3FM123456", "INFINITI"),  # Q50: JN1 is Nissan and Infiniti
+    ],
+)
+def test_shared_wmi_never_rejects_the_other_make(app, vin, target_make):
+    assert app.vin_check_digit_ok(vin)
+    assert app.predecode_vin(vin)["make"] is None
+    assert not app.vin_fails_prefilter(vin, 2014, 2015, target_make)
+
+
+def test_single_make_wmi_still_rejects_other_makes(app, make_vin):
+    sorento = make_vin("KNDJT2A2", "EG123456")
+    assert app.predecode_vin(sorento)["make"] == "KIA"
+    assert app.vin_fails_prefilter(sorento, make="HONDA")
+    assert not app.vin_fails_prefilter(sorento, 2014, 2014, make="KIA")
+    # Model year is still checked offline
+    assert app.vin_fails_prefilter(sorento, 2010, 2012, make="KIA")
+
+
+def test_santa_fe_built_in_kia_plant_reaches_nhtsa(app, make_vin):
+    # 2010-2012 Santa Fe from Kia's West Point plant shares WMI 5XY with Kia
+    santa_fe = make_vin("5XYZUDLB", "AG123456")
+    spec = app.compile_query("2010-2012 Hyundai Santa Fe")
+    assert spec.make == "HYUNDAI"
+    assert app.predecode_vin(santa_fe)["make"] is None
+    assert not app.vin_fails_prefilter(santa_fe, spec.ymin, spec.ymax, spec.make)